@@ -1,98 +1,166 @@
 import streamlit as st
-import feedparser
 from datetime import datetime, date, timedelta
+import html
+import io
 import json
 import os
-import pandas as pd
-import plotly.graph_objects as go
-import re
-import sqlite3
+import time
+
+from bulk import FORMATS as BULK_FORMATS, detect_format, export_projects, import_projects
+from burndown import BURNDOWN_RANGES, build_burndown_figure, velocity_summary
+from db import (
+    DEFAULT_BOARD_ID, ConflictError, board_id_by_name, board_summary, count_projects, create_board, db_revision,
+    load_boards, load_changed_projects, load_projects, new_project_key, progress_burndown, projects_fingerprint,
+    query_projects, save_projects
+)
+from gantt import build_gantt_figure
+from news import FEED_FIELDS, FETCH_STATS, MAX_ENTRIES, REFRESH_INTERVAL, FeedRefresher, load_feed_blocks, load_feeds, save_feeds
+from profiling import NullProfiler, Profiler, profiling_enabled
+from render import EMPTY_BLOCK_HTML, render_page_title, render_source_title
+from search import search_articles, search_projects
 
 # ==================== 1. 基礎設定與資料處理 ====================
 
+# Tracking 每頁顯示的專案數（逐列模式每列約十個 widget，表格模式整頁只有一個）
+TRACKING_PAGE_SIZE = 20
+TRACKING_TABLE_PAGE_SIZE = 100
+# Tracking 範圍篩選（對應 db.PROJECT_VIEWS）
+TRACKING_VIEWS = {
+    'all': '全部',
+    'overdue': '逾期',
+    'due_this_week': '本週到期',
+    'active_today': '今日進行中',
+}
+
 # 設定頁面配置為寬版面
 st.set_page_config(layout="wide", page_title="Morning Dashboard")
 
-# 資料庫檔案路徑（用於儲存專案資料）
-DB_FILE = "projects.db"
-
-# 初始化資料庫
-def init_db():
-    """初始化 SQLite 資料庫"""
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS projects (
-            key TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            start_date TEXT,
-            end_date TEXT,
-            progress INTEGER DEFAULT 0,
-            url TEXT
-        )
-    ''')
-    conn.commit()
-    conn.close()
+# 效能分析模式（?profile=1 或環境變數 MORNING_PROFILE=1）：記錄各區段耗時與 SQLite 查詢數
+profiler = Profiler() if profiling_enabled(st.query_params) else NullProfiler()
 
-# 載入專案資料的函數
-def load_projects():
-    """從資料庫載入專案資料"""
-    try:
-        init_db()
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-        c.execute('SELECT * FROM projects')
-        rows = c.fetchall()
-        conn.close()
-        
-        projects = {}
-        for row in rows:
-            key, name, start_date, end_date, progress, url = row
-            projects[key] = {
-                'name': name,
-                'start_date': start_date or '',
-                'end_date': end_date or '',
-                'progress': progress or 0,
-                'url': url or ''
-            }
-        return projects
-    except Exception as e:
-        st.error(f"載入專案資料時發生錯誤：{str(e)}")
-        return {}
-
-# 儲存專案資料的函數
-def save_projects(projects):
-    """將專案資料儲存到資料庫"""
+def finish_profile(rerun_reason=None):
+    """結束本次 rerun 的效能記錄並附加到紀錄檔；回傳 (摘要, 寫入紀錄檔時的錯誤或 None)"""
+    report = profiler.finish()
+    if rerun_reason:
+        report['rerun'] = rerun_reason
     try:
-        init_db()
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-        
-        # 清空現有資料
-        c.execute('DELETE FROM projects')
-        
-        # 插入新資料
-        for key, data in projects.items():
-            c.execute('''
-                INSERT OR REPLACE INTO projects (key, name, start_date, end_date, progress, url)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                key,
-                data.get('name', ''),
-                data.get('start_date', ''),
-                data.get('end_date', ''),
-                data.get('progress', 0),
-                data.get('url', '')
-            ))
-        
-        conn.commit()
-        conn.close()
-    except Exception as e:
-        st.error(f"儲存專案資料時發生錯誤：{str(e)}")
+        Profiler.append_log(report)
+    except OSError as e:
+        return report, e
+    return report, None
+
+def rerun(reason):
+    """寫入類操作以 st.rerun() 結束，不會執行到頁面底部的分析面板；先記下這次 rerun 再重新執行"""
+    if isinstance(profiler, Profiler):
+        profiler.lap(reason)
+        finish_profile(reason)
+    st.rerun()
+
+# --- 依專案資料指紋快取 Gantt 圖；資料沒變的 rerun 不重建、不解析日期 ---
+# 以 _ 開頭的參數不參與 Streamlit 的快取 key 計算，key 只有指紋（與日期）
+@st.cache_resource(max_entries=32)
+def cached_gantt_figure(fingerprint, today, _projects):
+    return build_gantt_figure(_projects, today)
+
+def invalidate_project_views():
+    """專案資料寫入後重新計算指紋，並只移除本 session 舊指紋的 Gantt 快取
+
+    快取是整個 process 共用的；其他 session/看板的圖表指紋不同，不受影響。
+    """
+    old_fingerprint = st.session_state.get('projects_fingerprint')
+    st.session_state.projects_fingerprint = projects_fingerprint(st.session_state.projects)
+    if old_fingerprint != st.session_state.projects_fingerprint:
+        cached_gantt_figure.clear(old_fingerprint, date.today(), None)
+
+# 看板：每個 session 只載入與寫入目前看板的專案（網址 ?board=看板名稱 可直接開啟指定看板）
+if 'board_id' not in st.session_state:
+    requested_board = st.query_params.get('board')
+    st.session_state.board_id = (board_id_by_name(requested_board) if requested_board else None) or DEFAULT_BOARD_ID
 
 # 初始化專案資料的 session_state
 if 'projects' not in st.session_state:
-    st.session_state.projects = load_projects()
+    st.session_state.projects = load_projects(st.session_state.board_id)
+    st.session_state.projects_fingerprint = projects_fingerprint(st.session_state.projects)
+# dirty 追蹤：{key: 變動欄位集合或 None(整列)}，以及待刪除的 {key: 讀取時的 version}
+if 'dirty_projects' not in st.session_state:
+    st.session_state.dirty_projects = {}
+    st.session_state.deleted_projects = {}
+
+def sync_projects():
+    """資料庫被其他 session/process 寫入時，只重新讀取有變動的列"""
+    revision = db_revision()
+    if st.session_state.get('db_revision') == revision:
+        return
+    known_versions = {key: data.get('version') for key, data in st.session_state.projects.items()}
+    changed, removed = load_changed_projects(known_versions, st.session_state.board_id)
+    st.session_state.db_revision = revision
+    if not changed and not removed:
+        return
+    for key in removed:
+        st.session_state.projects.pop(key, None)
+    st.session_state.projects.update(changed)
+    # 讓表格內的進度輸入框改用新值
+    for key in changed.keys() | removed:
+        st.session_state.pop(f"prog_input_{key}", None)
+    invalidate_project_views()
+
+sync_projects()
+profiler.lap('load_projects')
+
+def mark_dirty(project_key, fields=None):
+    """標記專案有變動；fields 為 None 代表整列都需要寫入"""
+    dirty = st.session_state.dirty_projects
+    if fields is None or dirty.get(project_key, set()) is None:
+        dirty[project_key] = None
+    else:
+        dirty[project_key] = frozenset(dirty.get(project_key, frozenset()) | set(fields))
+
+def mark_deleted(project_key, version):
+    """標記專案已刪除；version 為使用者在畫面上看到的版本，刪除時以它做 compare-and-swap"""
+    st.session_state.dirty_projects.pop(project_key, None)
+    st.session_state.deleted_projects[project_key] = version
+
+def flush_projects():
+    """只將 dirty 的專案寫回資料庫；與其他使用者的修改衝突時改以資料庫內容為準"""
+    try:
+        save_projects(
+            st.session_state.projects,
+            dirty=st.session_state.dirty_projects,
+            deleted=st.session_state.deleted_projects,
+            board_id=st.session_state.board_id
+        )
+    except ConflictError as e:
+        st.session_state.sync_notice = f"{e}，已重新載入最新資料，請再修改一次。"
+        # 整批已 rollback：丟棄這批修改的本地版本，下次 sync 會重新讀取這些列
+        for key in [*e.keys, *st.session_state.dirty_projects]:
+            if key in st.session_state.projects:
+                st.session_state.projects[key]['version'] = None
+        st.session_state.db_revision = None
+    st.session_state.dirty_projects = {}
+    st.session_state.deleted_projects = {}
+    invalidate_project_views()
+
+def open_board(board_id, board_name):
+    """切換看板：先寫回目前看板的修改，下次 rerun 再載入新看板的專案"""
+    flush_projects()
+    st.session_state.board_id = board_id
+    st.query_params['board'] = board_name
+    for key in ('projects', 'db_revision', 'tracking_page'):
+        st.session_state.pop(key, None)
+
+def switch_board_callback(board_names):
+    open_board(st.session_state.board_select, board_names[st.session_state.board_select])
+
+# --- Callback: 逐列模式的編輯 / 刪除按鈕 ---
+# callback 在 script 重新執行（與 sync_projects）之前執行，args 中的 version 就是畫面上顯示的版本；
+# 若在 script 中處理按鈕，sync 已先讀入別人的修改，版本檢查永遠不會失敗
+def start_edit_callback(project_key, version):
+    """開啟編輯表單，記下開啟時的版本；保存時以此版本做 compare-and-swap"""
+    st.session_state[f'editing_{project_key}'] = {'version': version}
+
+def request_delete_callback(project_key, version):
+    """記下要刪除的專案與畫面上的版本，由 Tracking 區塊寫入"""
+    st.session_state.setdefault('pending_deletes', {})[project_key] = version
 
 # --- Callback: 專門處理表格內直接修改進度 ---
 def update_progress_callback(project_key):
@@ -103,14 +171,47 @@ def update_progress_callback(project_key):
     # 更新 session_state 中的專案資料
     if project_key in st.session_state.projects:
         st.session_state.projects[project_key]['progress'] = new_value
-        # 立即存檔
-        save_projects(st.session_state.projects)
+        # 立即存檔（只更新這一列的進度）
+        mark_dirty(project_key, {'progress'})
+        flush_projects()
+
+# --- Tracking 表格模式：以單一 st.data_editor 呈現，進度修改批次寫回 ---
+def apply_table_edits_callback(editor_key, page_keys):
+    """將 data_editor 中修改的進度一次寫回資料庫"""
+    edited_rows = st.session_state[editor_key].get('edited_rows', {})
+    for row_index, changes in edited_rows.items():
+        project_key = page_keys[int(row_index)]
+        if 'ACH%' in changes and project_key in st.session_state.projects:
+            st.session_state.projects[project_key]['progress'] = int(changes['ACH%'] or 0)
+            mark_dirty(project_key, {'progress'})
+    flush_projects()
+
+def show_tracking_table(page_projects):
+    """以 data_editor 顯示一頁專案，只有 ACH% 欄可編輯"""
+    page_keys = [project_key for project_key, _ in page_projects]
+    # key 含資料指紋：寫入後指紋改變，editor 會以新資料重新建立，不殘留舊的編輯紀錄
+    editor_key = f"tracking_editor_{st.session_state.projects_fingerprint}_{hash(tuple(page_keys))}"
+    st.data_editor(
+        {
+            'Project': [d.get('name', '未命名專案') for _, d in page_projects],
+            'Start Day': [d.get('start_date', '') for _, d in page_projects],
+            'End Date': [d.get('end_date', '') for _, d in page_projects],
+            'ACH%': [int(d.get('progress', 0)) for _, d in page_projects],
+        },
+        column_config={
+            'ACH%': st.column_config.NumberColumn(min_value=0, max_value=100, step=5),
+        },
+        disabled=['Project', 'Start Day', 'End Date'],
+        hide_index=True,
+        use_container_width=True,
+        key=editor_key,
+        on_change=apply_table_edits_callback,
+        args=(editor_key, page_keys)
+    )
 
 # 取得今天的日期和星期
 today = datetime.now()
 today_date = date.today()
-date_str = today.strftime("%Y-%m-%d")
-weekday_str = today.strftime("%a")
 
 # ==================== 2. 全域 CSS 樣式 ====================
 st.markdown("""
@@ -184,9 +285,83 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ==================== 3. 頁面標題區塊 ====================
-st.markdown(f'<div class="centered-title"><h1>🌅 Morning! It\'s {date_str} {weekday_str}.</h1></div>', unsafe_allow_html=True)
+st.markdown(render_page_title(today), unsafe_allow_html=True)
 st.markdown("---")
 
+# --- 看板選擇與全文檢索：新聞（含過去累積的文章）與目前看板的專案 ---
+boards = load_boards()
+board_names = {board['id']: board['name'] for board in boards}
+if st.session_state.board_id not in board_names:
+    st.session_state.board_id = DEFAULT_BOARD_ID
+st.session_state.board_select = st.session_state.board_id
+col_board, col_search = st.columns([0.25, 0.75])
+with col_board:
+    st.selectbox(
+        "看板", list(board_names), format_func=board_names.get, key="board_select",
+        on_change=switch_board_callback, args=(board_names,), label_visibility="collapsed"
+    )
+with col_search:
+    search_query = st.text_input("搜尋", key="search_query", placeholder="🔍 搜尋新聞與專案", label_visibility="collapsed").strip()
+
+with st.expander("🗂️ 看板管理與總覽"):
+    with st.form("new_board_form", clear_on_submit=True):
+        col_board_name, col_board_owner = st.columns(2)
+        new_board_name = col_board_name.text_input("看板名稱")
+        new_board_owner = col_board_owner.text_input("負責人")
+        if st.form_submit_button("新增看板"):
+            try:
+                new_board_id = create_board(new_board_name, new_board_owner)
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                open_board(new_board_id, new_board_name.strip())
+                rerun('create_board')
+    # 總覽以單一彙總查詢計算所有看板，只在開啟時執行
+    if st.toggle("顯示所有看板總覽", key="show_board_summary"):
+        summary_rows = "".join(
+            f'<tr><td>{html.escape(row["name"])}</td><td>{html.escape(row["owner"])}</td>'
+            f'<td>{row["projects"]}</td><td>{row["completed"]}</td><td>{row["overdue"]}</td>'
+            f'<td>{row["due_this_week"]}</td><td>{row["avg_progress"]}%</td></tr>'
+            for row in board_summary(today_date)
+        )
+        st.markdown(
+            '<table class="calibri-text" style="width: 100%;"><tr><th>看板</th><th>負責人</th><th>專案</th>'
+            f'<th>已完成</th><th>逾期</th><th>本週到期</th><th>平均進度</th></tr>{summary_rows}</table>',
+            unsafe_allow_html=True
+        )
+
+if search_query:
+    search_start = time.perf_counter()
+    project_hits = search_projects(search_query, board_id=st.session_state.board_id)
+    article_hits = search_articles(search_query)
+    search_ms = (time.perf_counter() - search_start) * 1000
+    with st.container(border=True):
+        st.caption(f"找到 {len(project_hits)} 個專案、{len(article_hits)} 則新聞（{search_ms:.1f} ms）")
+        col_hit_projects, col_hit_articles = st.columns([0.4, 0.6])
+        with col_hit_projects:
+            for hit in project_hits:
+                name = html.escape(hit['name'])
+                if hit['url']:
+                    url = hit['url'] if hit['url'].startswith(('http://', 'https://')) else 'https://' + hit['url']
+                    name = f'<a href="{html.escape(url)}" target="_blank" style="text-decoration: none; color: #1f77b4;">{name}</a>'
+                st.markdown(f'<div class="calibri-text">{name}　{html.escape(hit["end_date"])}　{hit["progress"]}%</div>', unsafe_allow_html=True)
+        with col_hit_articles:
+            for hit in article_hits:
+                published = datetime.fromtimestamp(hit['sort_ts']).strftime("%Y-%m-%d")
+                link = hit['link'] if hit['link'].startswith(('http://', 'https://')) else '#'
+                st.markdown(
+                    f'<div class="calibri-text"><a href="{html.escape(link)}" target="_blank" style="text-decoration: none; color: #1f77b4;">{html.escape(hit["title"])}</a>'
+                    f' <span style="color: #999;">{html.escape(hit["source"])} {published}</span><br>'
+                    f'<span style="color: #666;">{html.escape(hit["snippet"] or "")}</span></div>',
+                    unsafe_allow_html=True
+                )
+
+# 儲存時與其他使用者的修改衝突
+if 'sync_notice' in st.session_state:
+    st.warning(st.session_state.pop('sync_notice'))
+
+profiler.lap('header_search')
+
 # 建立主要布局：左側 40%，右側 60%
 left_col, right_col = st.columns([0.4, 0.6])
 
@@ -194,81 +369,32 @@ left_col, right_col = st.columns([0.4, 0.6])
 with left_col:
     # --- 4.1 上半部：Gantt 圖 ---
     if len(st.session_state.projects) > 0:
-        gantt_data = []
-        for project_key, project_data in st.session_state.projects.items():
-            project_name = project_data.get('name', '未命名專案')
-            start_date_str = project_data.get('start_date', '')
-            end_date_str = project_data.get('end_date', '')
-            progress = project_data.get('progress', 0)
-            
-            if start_date_str and end_date_str:
-                try:
-                    start_date_obj = datetime.strptime(start_date_str, "%Y-%m-%d").date()
-                    end_date_obj = datetime.strptime(end_date_str, "%Y-%m-%d").date()
-                    duration = (end_date_obj - start_date_obj).days
-                    completed_days = int(duration * progress / 100)
-                    completed_end_date = start_date_obj + timedelta(days=completed_days)
-                    
-                    gantt_data.append({
-                        'Task': project_name,
-                        'Start': datetime.combine(start_date_obj, datetime.min.time()),
-                        'End': datetime.combine(end_date_obj, datetime.min.time()),
-                        'Completed': datetime.combine(completed_end_date, datetime.min.time()),
-                        'Progress': progress
-                    })
-                except:
-                    pass
-        
-        if gantt_data:
-            df_gantt = pd.DataFrame(gantt_data)
-            fig = go.Figure()
-            for idx, row in df_gantt.iterrows():
-                # 進度條（綠色）
-                fig.add_trace(go.Scatter(
-                    x=[row['Start'], row['Completed']],
-                    y=[row['Task'], row['Task']],
-                    mode='lines',
-                    line=dict(width=20, color='#4CAF50'),
-                    showlegend=False,
-                    hoverinfo='skip'
-                ))
-                # 剩餘條（灰色）
-                if row['Completed'] < row['End']:
-                    fig.add_trace(go.Scatter(
-                        x=[row['Completed'], row['End']],
-                        y=[row['Task'], row['Task']],
-                        mode='lines',
-                        line=dict(width=20, color='#E0E0E0'),
-                        showlegend=False,
-                        hoverinfo='skip'
-                    ))
-                
-                # 進度百分比文字
-                time_diff = row['End'] - row['Start']
-                mid_date = row['Start'] + time_diff / 2
-                fig.add_annotation(
-                    x=mid_date, y=row['Task'], text=f"{row['Progress']}%",
-                    showarrow=False, font=dict(size=10, color='black')
-                )
-            
-            # Today 虛線
-            today_datetime = datetime.combine(today_date, datetime.min.time())
-            fig.update_layout(
-                height=max(300, len(gantt_data) * 40),
-                showlegend=False,
-                xaxis=dict(showgrid=True, gridcolor='lightgray', type='date'),
-                yaxis=dict(showgrid=False),
-                plot_bgcolor='white',
-                font=dict(family='Calibri', size=12),
-                margin=dict(l=0, r=0, t=0, b=0)
-            )
-            fig.add_shape(type="line", x0=today_datetime, x1=today_datetime, y0=-0.5, y1=len(gantt_data) - 0.5, line=dict(color="blue", width=2, dash="dash"))
-            fig.add_annotation(x=today_datetime, y=len(gantt_data) - 0.5, text="Today", showarrow=False, font=dict(size=10, color='blue'), bgcolor="white", bordercolor="blue", borderwidth=1)
+        fig = cached_gantt_figure(st.session_state.projects_fingerprint, today_date, st.session_state.projects)
+        if fig is not None:
             st.plotly_chart(fig, use_container_width=True)
         else:
             st.info("沒有有效的專案日期資料")
     else:
         st.info("目前沒有專案")
+    profiler.lap('gantt')
+
+    # --- 4.1.1 燃盡圖：由每日彙總表一次查詢，不掃描原始歷史 ---
+    with st.expander("📉 燃盡圖 / 速度"):
+        # expander 收合時內容仍會執行；等使用者開啟才查詢彙總表、載入 plotly 並把圖表送到瀏覽器
+        if st.toggle("顯示燃盡圖", key="show_burndown"):
+            burndown_days = BURNDOWN_RANGES[st.radio("期間", list(BURNDOWN_RANGES), horizontal=True, key="burndown_range")]
+            burndown_rows = progress_burndown(today_date - timedelta(days=burndown_days - 1), today_date, board_id=st.session_state.board_id)
+            burndown_fig = build_burndown_figure(burndown_rows)
+            if burndown_fig is not None:
+                velocity, projected_finish = velocity_summary(burndown_rows, burndown_days)
+                col_remaining, col_velocity, col_finish = st.columns(3)
+                col_remaining.metric("剩餘工作量", burndown_rows[-1]['remaining'])
+                col_velocity.metric("平均速度 / 日", f"{velocity:.1f}")
+                col_finish.metric("推估完成", projected_finish.strftime('%Y-%m-%d') if projected_finish else "-")
+                st.plotly_chart(burndown_fig, use_container_width=True)
+            else:
+                st.info("這段期間沒有進度紀錄")
+    profiler.lap('burndown')
     
     st.markdown("<br>", unsafe_allow_html=True)
     
@@ -276,122 +402,148 @@ with left_col:
     st.markdown('<div class="header-18-bold">Tracking</div>', unsafe_allow_html=True)
     
     if len(st.session_state.projects) > 0:
-        # 排序：依結束日期
-        sorted_projects = sorted(
-            st.session_state.projects.items(),
-            key=lambda x: (
-                datetime.strptime(x[1].get('end_date', '9999-12-31'), "%Y-%m-%d").date() 
-                if x[1].get('end_date') else date(9999, 12, 31)
-            )
-        )
-        
-        # 表頭
-        col_header = st.columns([3, 1.2, 1.2, 0.8, 0.8])
-        col_header[0].markdown('<div class="calibri-text table-row"><strong>Project</strong></div>', unsafe_allow_html=True)
-        col_header[1].markdown('<div class="calibri-text table-row"><strong>Start Day</strong></div>', unsafe_allow_html=True)
-        col_header[2].markdown('<div class="calibri-text table-row"><strong>End Date</strong></div>', unsafe_allow_html=True)
-        col_header[3].markdown('<div class="calibri-text table-row"><strong>ACH%</strong></div>', unsafe_allow_html=True)
-        st.markdown("---")
+        # 篩選、檢視模式與分頁：每次 rerun 的 widget 數量與專案總數無關
+        col_filter, col_view, col_mode = st.columns([2, 1.5, 1.5])
+        with col_filter:
+            name_filter = st.text_input("篩選", key="tracking_filter", placeholder="篩選專案名稱", label_visibility="collapsed")
+        with col_view:
+            tracking_view = st.selectbox("範圍", list(TRACKING_VIEWS), format_func=TRACKING_VIEWS.get, key="tracking_view", label_visibility="collapsed")
+        with col_mode:
+            tracking_mode = st.radio("檢視", ["逐列", "表格"], key="tracking_mode", horizontal=True, label_visibility="collapsed")
+
+        # 排序（依結束日期）、篩選與分頁都在 SQLite 中完成，只取出這一頁
+        name_filter = name_filter.strip()
+        project_count = count_projects(tracking_view, today_date, name_filter, board_id=st.session_state.board_id)
+        page_size = TRACKING_PAGE_SIZE if tracking_mode == "逐列" else TRACKING_TABLE_PAGE_SIZE
+        page_count = max(1, -(-project_count // page_size))
+        page = 1
+        if page_count > 1:
+            # 篩選後頁數變少時，避免停留在超出範圍的頁碼
+            if st.session_state.get('tracking_page', 1) > page_count:
+                st.session_state.tracking_page = page_count
+            page = st.number_input(f"頁數（共 {page_count} 頁，{project_count} 個專案）", min_value=1, max_value=page_count, step=1, key="tracking_page")
+        page_projects = query_projects(tracking_view, today_date, name_filter, limit=page_size, offset=(page - 1) * page_size, board_id=st.session_state.board_id)
+
+        if tracking_mode == "表格":
+            show_tracking_table(page_projects)
+        else:
+            # 表頭
+            col_header = st.columns([3, 1.2, 1.2, 0.8, 0.8])
+            col_header[0].markdown('<div class="calibri-text table-row"><strong>Project</strong></div>', unsafe_allow_html=True)
+            col_header[1].markdown('<div class="calibri-text table-row"><strong>Start Day</strong></div>', unsafe_allow_html=True)
+            col_header[2].markdown('<div class="calibri-text table-row"><strong>End Date</strong></div>', unsafe_allow_html=True)
+            col_header[3].markdown('<div class="calibri-text table-row"><strong>ACH%</strong></div>', unsafe_allow_html=True)
+            st.markdown("---")
         
-        items_to_remove = []
-        for project_key, project_data in sorted_projects:
-            project_name = project_data.get('name', '未命名專案')
-            project_url = project_data.get('url', '').strip()
-            start_date = project_data.get('start_date', '')
-            end_date = project_data.get('end_date', '')
-            progress = project_data.get('progress', 0)
+            for project_key, project_data in page_projects:
+                project_name = project_data.get('name', '未命名專案')
+                project_url = project_data.get('url', '').strip()
+                start_date = project_data.get('start_date', '')
+                end_date = project_data.get('end_date', '')
+                progress = project_data.get('progress', 0)
             
-            # 每一行的欄位配置
-            col_row = st.columns([3, 1.2, 1.2, 0.8, 0.8])
+                # 每一行的欄位配置
+                col_row = st.columns([3, 1.2, 1.2, 0.8, 0.8])
             
-            # Project Name (Link)
-            with col_row[0]:
-                if project_url:
-                    url = project_url if project_url.startswith(('http://', 'https://')) else 'https://' + project_url
-                    st.markdown(f'<div class="calibri-text table-row"><a href="{url}" target="_blank" style="text-decoration: none; color: #1f77b4;">{project_name}</a></div>', unsafe_allow_html=True)
-                else:
-                    st.markdown(f'<div class="calibri-text table-row">{project_name}</div>', unsafe_allow_html=True)
+                # Project Name (Link)
+                with col_row[0]:
+                    if project_url:
+                        url = project_url if project_url.startswith(('http://', 'https://')) else 'https://' + project_url
+                        st.markdown(f'<div class="calibri-text table-row"><a href="{url}" target="_blank" style="text-decoration: none; color: #1f77b4;">{project_name}</a></div>', unsafe_allow_html=True)
+                    else:
+                        st.markdown(f'<div class="calibri-text table-row">{project_name}</div>', unsafe_allow_html=True)
             
-            # Dates
-            with col_row[1]: st.markdown(f'<div class="calibri-text table-row">{start_date}</div>', unsafe_allow_html=True)
-            with col_row[2]: st.markdown(f'<div class="calibri-text table-row">{end_date}</div>', unsafe_allow_html=True)
+                # Dates
+                with col_row[1]: st.markdown(f'<div class="calibri-text table-row">{start_date}</div>', unsafe_allow_html=True)
+                with col_row[2]: st.markdown(f'<div class="calibri-text table-row">{end_date}</div>', unsafe_allow_html=True)
             
-            # ACH% (改為輸入框！)
-            with col_row[3]: 
-                st.number_input(
-                    "progress",
-                    min_value=0, 
-                    max_value=100, 
-                    value=int(progress), 
-                    step=5,
-                    key=f"prog_input_{project_key}", # 給予每個輸入框唯一的 ID
-                    label_visibility="collapsed",    # 隱藏標籤
-                    on_change=update_progress_callback, # 綁定 callback 自動儲存
-                    args=(project_key,)              # 傳遞參數給 callback
-                )
+                # ACH% (改為輸入框！)
+                with col_row[3]: 
+                    st.number_input(
+                        "progress",
+                        min_value=0, 
+                        max_value=100, 
+                        value=int(progress), 
+                        step=5,
+                        key=f"prog_input_{project_key}", # 給予每個輸入框唯一的 ID
+                        label_visibility="collapsed",    # 隱藏標籤
+                        on_change=update_progress_callback, # 綁定 callback 自動儲存
+                        args=(project_key,)              # 傳遞參數給 callback
+                    )
             
-            # Buttons
-            with col_row[4]:
-                col_edit, col_delete = st.columns(2)
-                with col_edit:
-                    if st.button("✏️", key=f"edit_{project_key}", help="編輯"):
-                        st.session_state[f'editing_{project_key}'] = True
-                        st.rerun()
-                with col_delete:
-                    if st.button("🗑️", key=f"delete_{project_key}", help="刪除"):
-                        items_to_remove.append(project_key)
-
-            # 編輯模式 (修正：使用數字輸入框)
-            if st.session_state.get(f'editing_{project_key}', False):
-                with st.expander(f"✏️ 編輯：{project_name}", expanded=True):
-                    with st.form(f"edit_form_{project_key}"):
-                        new_name = st.text_input("專案名稱", value=project_name)
-                        new_url = st.text_input("專案連結（選填）", value=project_url)
+                # Buttons
+                with col_row[4]:
+                    col_edit, col_delete = st.columns(2)
+                    with col_edit:
+                        st.button(
+                            "✏️", key=f"edit_{project_key}", help="編輯",
+                            on_click=start_edit_callback, args=(project_key, project_data.get('version'))
+                        )
+                    with col_delete:
+                        st.button(
+                            "🗑️", key=f"delete_{project_key}", help="刪除",
+                            on_click=request_delete_callback, args=(project_key, project_data.get('version'))
+                        )
+
+                # 編輯模式 (修正：使用數字輸入框)
+                editing = st.session_state.get(f'editing_{project_key}')
+                if editing:
+                    with st.expander(f"✏️ 編輯：{project_name}", expanded=True):
+                        with st.form(f"edit_form_{project_key}"):
+                            new_name = st.text_input("專案名稱", value=project_name)
+                            new_url = st.text_input("專案連結（選填）", value=project_url)
                         
-                        s_date = None
-                        e_date = None
-                        if start_date:
-                            try: s_date = datetime.strptime(start_date, "%Y-%m-%d").date()
-                            except: pass
-                        if end_date:
-                            try: e_date = datetime.strptime(end_date, "%Y-%m-%d").date()
-                            except: pass
+                            s_date = None
+                            e_date = None
+                            if start_date:
+                                try: s_date = datetime.strptime(start_date, "%Y-%m-%d").date()
+                                except: pass
+                            if end_date:
+                                try: e_date = datetime.strptime(end_date, "%Y-%m-%d").date()
+                                except: pass
                             
-                        new_start_edit = st.date_input("Start Day", value=s_date)
-                        new_end_edit = st.date_input("End Date", value=e_date)
+                            new_start_edit = st.date_input("Start Day", value=s_date)
+                            new_end_edit = st.date_input("End Date", value=e_date)
                         
-                        # 改為 Number Input
-                        new_progress = st.number_input("進度 (%)", min_value=0, max_value=100, value=progress, step=5)
+                            # 改為 Number Input
+                            new_progress = st.number_input("進度 (%)", min_value=0, max_value=100, value=progress, step=5)
                         
-                        col_save, col_cancel = st.columns(2)
-                        with col_save:
-                            if st.form_submit_button("💾 保存"):
-                                # 更新資料
-                                st.session_state.projects[project_key]['name'] = new_name
-                                st.session_state.projects[project_key]['start_date'] = str(new_start_edit)
-                                st.session_state.projects[project_key]['end_date'] = str(new_end_edit)
-                                st.session_state.projects[project_key]['progress'] = new_progress
+                            col_save, col_cancel = st.columns(2)
+                            with col_save:
+                                if st.form_submit_button("💾 保存"):
+                                    # 更新資料
+                                    st.session_state.projects[project_key]['name'] = new_name
+                                    st.session_state.projects[project_key]['start_date'] = str(new_start_edit)
+                                    st.session_state.projects[project_key]['end_date'] = str(new_end_edit)
+                                    st.session_state.projects[project_key]['progress'] = new_progress
                                 
-                                if new_url.strip():
-                                    st.session_state.projects[project_key]['url'] = new_url.strip()
-                                else:
-                                    st.session_state.projects[project_key].pop('url', None)
+                                    if new_url.strip():
+                                        st.session_state.projects[project_key]['url'] = new_url.strip()
+                                    else:
+                                        st.session_state.projects[project_key].pop('url', None)
                                     
-                                save_projects(st.session_state.projects)
-                                st.session_state[f'editing_{project_key}'] = False
-                                st.rerun()
-                        with col_cancel:
-                            if st.form_submit_button("❌ 取消"):
-                                st.session_state[f'editing_{project_key}'] = False
-                                st.rerun()
-            st.markdown("---")
+                                    # 以開啟表單時的版本寫入；期間被別人修改會回報衝突，而不是覆蓋對方的修改
+                                    st.session_state.projects[project_key]['version'] = editing['version']
+                                    mark_dirty(project_key)
+                                    flush_projects()
+                                    st.session_state[f'editing_{project_key}'] = False
+                                    rerun('save_project')
+                            with col_cancel:
+                                if st.form_submit_button("❌ 取消"):
+                                    st.session_state[f'editing_{project_key}'] = False
+                                    rerun('cancel_edit')
+                st.markdown("---")
             
-        # 刪除處理
-        if items_to_remove:
-            for key in items_to_remove:
-                del st.session_state.projects[key]
-            save_projects(st.session_state.projects)
-            st.rerun()
+        # 刪除處理（已被別人刪除的專案略過）
+        pending_deletes = st.session_state.pop('pending_deletes', {})
+        if pending_deletes:
+            for key, version in pending_deletes.items():
+                if key in st.session_state.projects:
+                    mark_deleted(key, version)
+                    del st.session_state.projects[key]
+            flush_projects()
+            rerun('delete_projects')
+    profiler.lap('tracking')
             
     # 新增專案表單 (修正：使用數字輸入框)
     with st.expander("➕ 新增專案"):
@@ -404,96 +556,135 @@ with left_col:
             new_ach = st.number_input("進度 (%)", min_value=0, max_value=100, value=0, step=5)
             
             if st.form_submit_button("新增"):
-                key = f"project_{int(datetime.now().timestamp())}"
+                key = new_project_key()
                 
                 project_data = {
                     "name": new_name,
                     "start_date": str(new_start),
                     "end_date": str(new_end),
-                    "progress": new_ach
+                    "progress": new_ach,
+                    "version": 0
                 }
                 
                 if new_url.strip():
                     project_data['url'] = new_url.strip()
                     
                 st.session_state.projects[key] = project_data
-                save_projects(st.session_state.projects)
-                st.rerun()
+                mark_dirty(key)
+                flush_projects()
+                rerun('add_project')
+
+    # 大量匯入 / 匯出（大型檔案建議使用 CLI：python bulk.py import/export）
+    with st.expander("📦 匯入 / 匯出"):
+        uploaded = st.file_uploader("匯入專案（JSON / JSONL / CSV）", type=list(BULK_FORMATS))
+        if uploaded is not None and st.button("開始匯入"):
+            try:
+                fp = io.TextIOWrapper(uploaded, encoding='utf-8-sig', newline='')
+                imported, errors = import_projects(fp, detect_format(uploaded.name), board_id=st.session_state.board_id)
+                st.session_state.projects = load_projects(st.session_state.board_id)
+                invalidate_project_views()
+                st.success(f"已匯入 {imported} 筆")
+                for position, message in errors[:20]:
+                    st.warning(f"略過第 {position} 筆：{message}")
+            except Exception as e:
+                st.error(f"匯入專案資料時發生錯誤：{str(e)}")
+
+        export_format = st.selectbox("匯出格式", BULK_FORMATS, key="export_format")
+        if st.button("產生匯出檔"):
+            buffer = io.StringIO()
+            export_projects(buffer, export_format, board_id=st.session_state.board_id)
+            st.download_button("⬇️ 下載", buffer.getvalue().encode('utf-8'), file_name=f"projects.{export_format}")
+
+    profiler.lap('project_forms')
 
 # ==================== 5. 右側欄位：News Feed (HTML 零間距版) ====================
 with right_col:
     st.markdown('<div class="header-18-bold">News Feed</div>', unsafe_allow_html=True)
     st.markdown("<br>", unsafe_allow_html=True)
     
-    # 定義新聞來源
-    news_sources_map = {
-        'top_left': { 'name': 'BBC 中文', 'url': 'https://feeds.bbci.co.uk/zhongwen/trad/rss.xml' },
-        'top_right': { 'name': '德國之聲 (DW)', 'url': 'https://rss.dw.com/rdf/rss-chi-all' },
-        'bottom_left': { 'name': '報導者 (The Reporter)', 'url': 'https://www.twreporter.org/a/rss2.xml' },
-        'bottom_right': { 'name': '公視新聞 (PTS)', 'url': 'https://news.pts.org.tw/xml/newsfeed.xml' }
-    }
+    # 新聞來源設定存在資料庫的 feeds 資料表，依版面位置 (slot) 排序
+    news_sources = load_feeds(enabled_only=True)
     
     col1, col2 = st.columns(2)
     
-    # 快取新聞，避免重複請求
-    @st.cache_data(ttl=3600)
-    def fetch_news(rss_url):
-        try:
-            feed = feedparser.parse(rss_url)
-            return feed.entries[:10]  # 限制抓取 10 則
-        except Exception:
-            return []
-
-    # 渲染新聞區塊 (去除多餘空格以避免 Markdown 誤判)
+    # 背景 thread 依各來源的更新間隔抓取新聞寫入資料庫；每個 process 只啟動一次
+    @st.cache_resource
+    def start_news_refresher():
+        refresher = FeedRefresher()
+        refresher.start()
+        return refresher
+
+    news_refresher = start_news_refresher()
+
+    # 各來源預先產生的 HTML 區塊，一次查詢取回；畫面渲染不等待網路
+    news_blocks = load_feed_blocks(source['url'] for source in news_sources)
+    profiler.lap('news_load')
+
+    # 渲染新聞區塊 (區塊 HTML 已壓成一行，避免 Markdown 誤判)
     def show_news_block(container, source_info):
         with container:
             # 顯示來源標題
-            st.markdown(f'<div style="font-family:Calibri; font-size:14px; font-weight:bold; margin-bottom:5px; padding-top:10px;">{source_info["name"]}</div>', unsafe_allow_html=True)
-            
-            entries = fetch_news(source_info['url'])
+            st.markdown(render_source_title(source_info['name']), unsafe_allow_html=True)
             
-            if entries:
-                # 組合 HTML 字串
-                html_items = ""
-                
-                for entry in entries:
-                    # 處理摘要內容 (移除 HTML tag)
-                    summary = "點擊閱讀更多..."
-                    if hasattr(entry, 'summary'):
-                        clean_summary = re.sub('<[^<]+?>', '', entry.summary)
-                        summary = clean_summary[:60] + "..." if len(clean_summary) > 60 else clean_summary
-                    
-                    # 每一條新聞的 HTML (details 標籤)
-                    # 修正：font-weight: 600 -> normal (去粗體)
-                    item_html = f"""
-                    <details style="border-bottom: 1px solid #f0f0f0; margin: 0; padding: 4px 0; background-color: white;">
-                        <summary style="font-family: 'Calibri', sans-serif; font-size: 10pt; font-weight: normal; cursor: pointer; outline: none; color: #333; list-style: none;">
-                            <span style="margin-right: 5px;">➤</span> {entry.title}
-                        </summary>
-                        <div style="font-family: 'Calibri', sans-serif; font-size: 10px; color: #666; padding: 4px 0 4px 18px; line-height: 1.4;">
-                            <a href="{entry.link}" target="_blank" style="color: #1f77b4; text-decoration: none; font-weight: bold;">🔗 閱讀全文</a><br>
-                            {summary}
-                        </div>
-                    </details>
-                    """
-                    # 將多行字串壓扁成一行
-                    html_items += "".join([line.strip() for line in item_html.split('\n')])
-
-                # 包裹在外層 div
-                full_html = f'<div style="border-top: 1px solid #f0f0f0;">{html_items}</div>'
-                
-                # 一次性渲染整塊 HTML
-                st.markdown(full_html, unsafe_allow_html=True)
-            else:
-                st.markdown('<div class="calibri-text" style="color: #999;">暫無資料</div>', unsafe_allow_html=True)
+            full_html = news_blocks.get(source_info['url'])
+            profiler.record_feed(source_info['name'], source_info['url'], bool(full_html), FETCH_STATS.get(source_info['url']))
+            # 一次性渲染整塊 HTML
+            st.markdown(full_html or EMPTY_BLOCK_HTML, unsafe_allow_html=True)
 
-    # 放置四個象限
-    with col1:
-        show_news_block(st.container(), news_sources_map['top_left'])
-        show_news_block(st.container(), news_sources_map['bottom_left'])
-        
-    with col2:
-        show_news_block(st.container(), news_sources_map['top_right'])
-        show_news_block(st.container(), news_sources_map['bottom_right'])
+    # 依序左右交錯放置（slot 0 左上、1 右上、2 左下、3 右下……）
+    for index, source_info in enumerate(news_sources):
+        with (col1 if index % 2 == 0 else col2):
+            show_news_block(st.container(), source_info)
+    profiler.lap('news_render')
 
-st.markdown("<br><br>", unsafe_allow_html=True)
\ No newline at end of file
+    # 來源設定：修改後立即生效，不需重新部署
+    # expander 內容每次 rerun 都會執行；data_editor 會載入 pandas，因此等使用者開啟編輯才建立
+    with st.expander("⚙️ 新聞來源設定"):
+        if st.toggle("編輯來源", key="edit_feed_registry"):
+            edited_feeds = st.data_editor(
+                [{field: feed[field] for field in FEED_FIELDS} for feed in load_feeds()],
+                column_config={
+                    'name': st.column_config.TextColumn("名稱", required=True),
+                    'url': st.column_config.TextColumn("RSS 網址", required=True),
+                    'refresh_interval': st.column_config.NumberColumn("更新間隔（秒）", min_value=60, step=60, default=REFRESH_INTERVAL),
+                    'max_entries': st.column_config.NumberColumn("則數", min_value=1, max_value=50, step=1, default=MAX_ENTRIES),
+                    'enabled': st.column_config.CheckboxColumn("啟用", default=True),
+                    'slot': st.column_config.NumberColumn("位置", min_value=0, step=1, default=0),
+                },
+                num_rows="dynamic",
+                hide_index=True,
+                use_container_width=True,
+                key="feed_registry_editor"
+            )
+            if st.button("💾 儲存來源設定"):
+                try:
+                    save_feeds(edited_feeds)
+                except Exception as e:
+                    st.error(f"儲存新聞來源時發生錯誤：{str(e)}")
+                else:
+                    news_refresher.wake()
+                    rerun('save_feeds')
+
+    profiler.lap('news_settings')
+
+st.markdown("<br><br>", unsafe_allow_html=True)
+
+# ==================== 6. 效能分析面板（僅分析模式） ====================
+if isinstance(profiler, Profiler):
+    profile_report, log_error = finish_profile()
+    if log_error:
+        st.warning(f"無法寫入效能紀錄：{str(log_error)}")
+    with st.expander(f"🛠️ Profiling：{profile_report['total_ms']:.1f} ms，SQLite {profile_report['sqlite_queries']} 次查詢 / {profile_report['sqlite_rows']} 列"):
+        col_sections, col_feeds = st.columns(2)
+        with col_sections:
+            st.table([{'section': name, 'ms': ms} for name, ms in profile_report['sections_ms'].items()])
+        with col_feeds:
+            st.table([
+                {
+                    'source': name,
+                    'block cache': 'hit' if feed['hit'] else 'miss',
+                    'last fetch': feed.get('status', '-'),
+                    'fetch ms': feed.get('latency_ms', '-'),
+                }
+                for name, feed in profile_report['feeds'].items()
+            ])
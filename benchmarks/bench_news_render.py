@@ -0,0 +1,89 @@
+"""News Feed 渲染路徑微基準測試
+
+比較舊版每次 rerun 都執行的 re.sub + 多行 f-string + split/strip + 字串 += 組裝，
+與現在「每個 feed 版本只渲染一次、rerun 時只做一次查詢」的成本。
+執行方式（於專案根目錄）：
+
+    python benchmarks/bench_news_render.py
+"""
+import os
+import re
+import sys
+import tempfile
+import time
+
+from feedparser import FeedParserDict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from news import MAX_ENTRIES, html_to_text, load_feed_blocks, render_feed_block, store_articles  # noqa: E402
+
+SOURCES = 4
+REPEAT = 200
+
+
+def make_entries(source, n=MAX_ENTRIES):
+    return [
+        FeedParserDict(
+            id=f"{source}-{i}",
+            title=f"新聞標題 {source}-{i} &amp; 更多",
+            link=f"https://example.com/{source}/{i}",
+            summary="<p>" + "這是一段<b>摘要</b>內容，" * 20 + "</p><img src='x.jpg'>"
+        )
+        for i in range(n)
+    ]
+
+
+def legacy_render(entries):
+    """舊版 show_news_block 的 HTML 組裝"""
+    html_items = ""
+    for entry in entries:
+        summary = "點擊閱讀更多..."
+        if hasattr(entry, 'summary'):
+            clean_summary = re.sub('<[^<]+?>', '', entry.summary)
+            summary = clean_summary[:60] + "..." if len(clean_summary) > 60 else clean_summary
+        item_html = f"""
+        <details style="border-bottom: 1px solid #f0f0f0; margin: 0; padding: 4px 0; background-color: white;">
+            <summary style="font-family: 'Calibri', sans-serif; font-size: 10pt; font-weight: normal; cursor: pointer; outline: none; color: #333; list-style: none;">
+                <span style="margin-right: 5px;">➤</span> {entry.title}
+            </summary>
+            <div style="font-family: 'Calibri', sans-serif; font-size: 10px; color: #666; padding: 4px 0 4px 18px; line-height: 1.4;">
+                <a href="{entry.link}" target="_blank" style="color: #1f77b4; text-decoration: none; font-weight: bold;">🔗 閱讀全文</a><br>
+                {summary}
+            </div>
+        </details>
+        """
+        html_items += "".join([line.strip() for line in item_html.split('\n')])
+    return f'<div style="border-top: 1px solid #f0f0f0;">{html_items}</div>'
+
+
+def per_rerun_us(fn):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        fn()
+    return (time.perf_counter() - start) / REPEAT * 1e6
+
+
+def main():
+    feeds = {f"https://example.com/feed{s}.xml": make_entries(s) for s in range(SOURCES)}
+
+    legacy_us = per_rerun_us(lambda: [legacy_render(entries) for entries in feeds.values()])
+    ingest_us = per_rerun_us(lambda: [
+        render_feed_block([(html_to_text(e.title), e.link, html_to_text(e.summary)) for e in entries])
+        for entries in feeds.values()
+    ])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, 'bench.db')
+        for url, entries in feeds.items():
+            store_articles(url, entries, db_file=db_file)
+        lookup_us = per_rerun_us(lambda: load_feed_blocks(feeds, db_file=db_file))
+
+    print(f"{SOURCES} sources x {MAX_ENTRIES} entries")
+    print(f"  legacy render, every rerun:          {legacy_us:>9.1f} us")
+    print(f"  html_to_text + render, per feed ver: {ingest_us:>9.1f} us")
+    print(f"  cached block lookup, every rerun:    {lookup_us:>9.1f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""save_projects 寫入成本基準測試
+
+比較「整表刪除再重新插入」與「只寫入 dirty 列」在不同資料量下，
+修改單一專案進度所需的時間。執行方式（於專案根目錄）：
+
+    python benchmarks/bench_save_projects.py
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import save_projects  # noqa: E402
+
+SIZES = (100, 1000, 5000, 20000)
+REPEAT = 20
+
+
+def make_projects(n):
+    return {
+        f"project_{i}": {
+            'name': f"Project {i}",
+            'start_date': '2026-01-01',
+            'end_date': '2026-12-31',
+            'progress': i % 100,
+            'url': f"https://example.com/{i}"
+        }
+        for i in range(n)
+    }
+
+
+def full_rewrite(projects, db_file):
+    """舊版 save_projects：DELETE 全表後逐列 INSERT"""
+    conn = sqlite3.connect(db_file)
+    c = conn.cursor()
+    c.execute('DELETE FROM projects')
+    for key, data in projects.items():
+        c.execute('''
+            INSERT OR REPLACE INTO projects (key, name, start_date, end_date, progress, url)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (key, data['name'], data['start_date'], data['end_date'], data['progress'], data['url']))
+    conn.commit()
+    conn.close()
+
+
+def timed(fn):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        fn()
+    return (time.perf_counter() - start) / REPEAT * 1000
+
+
+def main():
+    print(f"{'projects':>10} {'full rewrite (ms)':>18} {'dirty row (ms)':>15}")
+    for n in SIZES:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_file = os.path.join(tmp, 'bench.db')
+            projects = make_projects(n)
+            save_projects(projects, db_file=db_file)
+            key = next(iter(projects))
+
+            def one_progress_change():
+                projects[key]['progress'] = (projects[key]['progress'] + 5) % 100
+                save_projects(projects, dirty={key: frozenset({'progress'})}, db_file=db_file)
+
+            full_ms = timed(lambda: full_rewrite(projects, db_file))
+            dirty_ms = timed(one_progress_change)
+            print(f"{n:>10} {full_ms:>18.2f} {dirty_ms:>15.2f}")
+
+
+if __name__ == '__main__':
+    main()
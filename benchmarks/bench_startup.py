@@ -0,0 +1,96 @@
+"""冷啟動 import 成本基準測試
+
+以 `python -X importtime` 在全新的 process 中載入 app.py 用到的模組，量測 import 耗時，
+並確認 pandas / plotly.graph_objects / feedparser 等重量級模組不會在啟動時被載入
+（它們只在實際畫圖或背景抓取新聞時才 import）。超過預算或載入了禁止的模組時以 exit code 1 結束，
+可放在 CI 中守住冷啟動時間。執行方式（於專案根目錄）：
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --budget-ms 150
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# app.py 在頂層 import 的本專案模組
+APP_MODULES = ('bulk', 'burndown', 'db', 'gantt', 'news', 'profiling', 'render', 'search')
+# 冷啟動時不應載入的模組
+HEAVY_MODULES = ('pandas', 'plotly.graph_objects', 'feedparser')
+REPEAT = 5
+# 本專案模組（不含 streamlit 本身）的 import 時間預算
+BUDGET_MS = 50.0
+
+
+def import_profile():
+    """在新的 process 中先載入 streamlit 再載入 APP_MODULES
+
+    回傳 (streamlit µs, {本專案 import 造成的頂層模組: 累計 µs}, 本專案 import 額外載入的模組名稱)。
+    -X importtime 依載入完成的順序輸出，streamlit 那一行之後的都是本專案模組造成的。
+    """
+    code = f"import streamlit; import {', '.join(APP_MODULES)}"
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, check=True, cwd=ROOT
+    ).stderr
+
+    streamlit_us = None
+    top_level = {}
+    loaded = set()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # 巢狀 import 以縮排表示；只累計最外層的模組
+        nested = name.startswith('  ')
+        name = name.strip()
+        if streamlit_us is None:
+            if name == 'streamlit' and not nested:
+                streamlit_us = int(cumulative)
+            continue
+        loaded.add(name)
+        if not nested:
+            top_level[name] = top_level.get(name, 0) + int(cumulative)
+    return streamlit_us or 0, top_level, loaded
+
+
+def measure_startup(repeat=REPEAT):
+    """多次量測取中位數；回傳 (streamlit ms, 本專案模組 ms, 本專案 import 載入的重量級模組, 最後一次的頂層模組耗時)"""
+    streamlit_ms, app_ms = [], []
+    heavy = set()
+    for _ in range(repeat):
+        streamlit_us, top_level, loaded = import_profile()
+        streamlit_ms.append(streamlit_us / 1000)
+        app_ms.append(sum(top_level.values()) / 1000)
+        heavy |= {name for name in HEAVY_MODULES if name in loaded}
+    return statistics.median(streamlit_ms), statistics.median(app_ms), sorted(heavy), top_level
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="冷啟動 import 成本基準測試")
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('--budget-ms', type=float, default=BUDGET_MS, help="本專案模組 import 時間上限")
+    args = parser.parse_args(argv)
+
+    streamlit_ms, app_ms, heavy, top_level = measure_startup(args.repeat)
+    print(f"streamlit          {streamlit_ms:8.1f} ms")
+    print(f"app modules        {app_ms:8.1f} ms  (budget {args.budget_ms:.0f} ms)")
+    print("\n本專案 import 中最重的頂層模組（最後一次量測）：")
+    for name, us in sorted(top_level.items(), key=lambda item: -item[1])[:10]:
+        print(f"  {name:<30} {us / 1000:8.1f} ms")
+
+    failed = False
+    if heavy:
+        print(f"\n冷啟動時載入了重量級模組：{', '.join(heavy)}")
+        failed = True
+    if app_ms > args.budget_ms:
+        print(f"\n本專案模組 import 時間 {app_ms:.1f} ms 超過預算 {args.budget_ms:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
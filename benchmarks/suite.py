@@ -0,0 +1,380 @@
+"""Morning Dashboard 無瀏覽器基準測試套件
+
+以合成資料（10–10,000 筆專案）與本機 HTTP 伺服器提供的 RSS 錄製檔（fixtures/）量測熱路徑：
+
+- save_projects：整表寫入與單列進度變更
+- load_projects：讀取吞吐量
+- build_gantt_figure：Gantt 圖建立時間
+- feed：從本機伺服器抓取 + 解析、純解析、寫入 articles 並預先渲染
+- startup：以 -X importtime 量測冷啟動時 streamlit 與本專案模組的 import 耗時（見 bench_startup.py）
+- app_rerun：以 streamlit.testing.v1.AppTest 執行整個 app.py 的首次與後續 rerun 延遲
+
+每次執行輸出一份 JSON 報告（預設 benchmarks/reports/<commit>.json），
+可用 compare 子命令比較兩個 commit 的報告。執行方式（於專案根目錄）：
+
+    python benchmarks/suite.py run
+    python benchmarks/suite.py run --sizes 10 100 --repeat 3 --skip-app
+    python benchmarks/suite.py compare benchmarks/reports/<舊>.json benchmarks/reports/<新>.json
+    python benchmarks/suite.py record          # 從 feeds 資料表中的來源重新錄製 fixtures
+"""
+import argparse
+import functools
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+from contextlib import contextmanager
+from datetime import date, timedelta
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import feedparser  # noqa: E402
+
+from bench_startup import measure_startup  # noqa: E402
+from db import DB_FILE, get_connection, load_projects, save_projects  # noqa: E402
+from gantt import build_gantt_figure  # noqa: E402
+from news import (  # noqa: E402
+    FeedRefresher, USER_AGENT, fetch_feed, load_feeds, save_feeds, store_articles
+)
+
+FIXTURES_DIR = os.path.join(ROOT, 'benchmarks', 'fixtures')
+REPORTS_DIR = os.path.join(ROOT, 'benchmarks', 'reports')
+APP_FILE = os.path.join(ROOT, 'app.py')
+
+SIZES = (10, 100, 1000, 10000)
+REPEAT = 5
+APP_RERUNS = 5
+# compare 時超過此百分比的變慢視為退化
+THRESHOLD = 10.0
+SEED = 20260101
+
+
+# ==================== 合成資料 ====================
+
+def make_projects(n, seed=SEED):
+    """產生 n 筆可重現的合成專案（部分缺少日期、部分已完成，貼近實際分布）"""
+    rng = random.Random(seed)
+    today = date.today()
+    projects = {}
+    for i in range(n):
+        start = today + timedelta(days=rng.randint(-180, 60))
+        end = start + timedelta(days=rng.randint(1, 240))
+        missing_dates = rng.random() < 0.05
+        projects[f"project_{i:06d}"] = {
+            'name': f"Project {i} {rng.choice(['Alpha', 'Beta', '規劃', '導入', 'Migration'])}",
+            'start_date': None if missing_dates else start.isoformat(),
+            'end_date': None if missing_dates else end.isoformat(),
+            'progress': 100 if rng.random() < 0.2 else rng.randint(0, 99),
+            'url': f"https://example.com/projects/{i}"
+        }
+    return projects
+
+
+# ==================== RSS fixtures 伺服器 ====================
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def fixture_server(directory=FIXTURES_DIR):
+    """在 127.0.0.1 的隨機埠提供 fixtures 目錄；支援 Last-Modified / If-Modified-Since（304）"""
+    handler = functools.partial(_QuietHandler, directory=directory)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def fixture_names(directory=FIXTURES_DIR):
+    return sorted(name for name in os.listdir(directory) if name.endswith('.xml'))
+
+
+def fixture_feeds(base_url, directory=FIXTURES_DIR):
+    """每個 fixture 對應一個 feeds 資料表的來源（依檔名排序放入 slot）"""
+    return [
+        {
+            'name': name[:-len('.xml')],
+            'url': f"{base_url}/{name}",
+            'refresh_interval': 3600,
+            'max_entries': 10,
+            'enabled': True,
+            'slot': slot,
+        }
+        for slot, name in enumerate(fixture_names(directory))
+    ]
+
+
+def record_fixtures(db_file=DB_FILE, directory=FIXTURES_DIR):
+    """下載 feeds 資料表中已啟用來源的原始 RSS，以主機名稱存成 fixture"""
+    for feed in load_feeds(enabled_only=True, db_file=db_file):
+        request = urllib.request.Request(feed['url'], headers={'User-Agent': USER_AGENT})
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                body = response.read()
+        except Exception as e:
+            print(f"略過 {feed['name']}：{e}")
+            continue
+        path = os.path.join(directory, urllib.parse.urlsplit(feed['url']).hostname + '.xml')
+        with open(path, 'wb') as f:
+            f.write(body)
+        print(f"{feed['name']} -> {path} ({len(body)} bytes)")
+
+
+# ==================== 量測 ====================
+
+def measure(fn, repeat=REPEAT, setup=None):
+    """執行 repeat 次，回傳每次耗時（毫秒）的中位數與最小值"""
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {'median_ms': round(statistics.median(samples), 3), 'min_ms': round(min(samples), 3)}
+
+
+def bench_projects(n, repeat, tmp):
+    """save_projects / load_projects / build_gantt_figure"""
+    results = {}
+    projects = make_projects(n)
+    db_file = os.path.join(tmp, f"projects_{n}.db")
+
+    # 每輪寫入新的空資料庫；連線由 st.cache_resource 依檔名共用，所以每輪用不同檔名。
+    # 建立連線、WAL 與 migration 在 setup 完成，只量測 save_projects 本身
+    counter = iter(range(repeat))
+    target = {}
+
+    def new_database():
+        target['db_file'] = f"{db_file}.{next(counter)}"
+        get_connection(target['db_file'])
+
+    def full_save():
+        save_projects(projects, db_file=target['db_file'])
+
+    stats = measure(full_save, repeat, setup=new_database)
+    stats['rows_per_s'] = round(n / stats['median_ms'] * 1000)
+    results[f"save_projects.full[n={n}]"] = stats
+
+    save_projects(projects, db_file=db_file)
+    key = next(iter(projects))
+
+    def one_progress_change():
+        projects[key]['progress'] = (projects[key]['progress'] + 5) % 100
+        save_projects(projects, dirty={key: frozenset({'progress'})}, db_file=db_file)
+
+    results[f"save_projects.dirty_row[n={n}]"] = measure(one_progress_change, repeat)
+
+    stats = measure(lambda: load_projects(db_file=db_file), repeat)
+    stats['rows_per_s'] = round(n / stats['median_ms'] * 1000)
+    results[f"load_projects[n={n}]"] = stats
+
+    loaded = load_projects(db_file=db_file)
+    results[f"gantt.build[n={n}]"] = measure(lambda: build_gantt_figure(loaded, date.today()), repeat)
+    return results
+
+
+def bench_feeds(repeat, tmp):
+    """從本機伺服器抓取 + 解析、純解析、寫入 articles 並預先渲染"""
+    results = {}
+    db_file = os.path.join(tmp, 'feeds.db')
+    with fixture_server() as base_url:
+        for name in fixture_names():
+            url = f"{base_url}/{name}"
+            with open(os.path.join(FIXTURES_DIR, name), 'rb') as f:
+                body = f.read()
+            label = name[:-len('.xml')]
+
+            results[f"feed.fetch_parse[{label}]"] = measure(lambda: fetch_feed(url, {}), repeat)
+
+            # 帶上次的 Last-Modified 重新請求，伺服器回 304，不需解析
+            state = {}
+            fetch_feed(url, state)
+            results[f"feed.fetch_304[{label}]"] = measure(lambda: fetch_feed(url, state), repeat)
+
+            results[f"feed.parse[{label}]"] = measure(lambda: feedparser.parse(body), repeat)
+
+            entries = feedparser.parse(body).entries
+            # 每輪改變 guid 讓內容雜湊不同，量測實際寫入與渲染的成本
+            rounds = iter(range(repeat))
+
+            def new_version():
+                round_no = next(rounds)
+                for entry in entries:
+                    entry['id'] = f"{entry.get('link')}#{round_no}"
+
+            results[f"feed.store_render[{label}]"] = measure(
+                lambda: store_articles(url, entries, db_file=db_file), repeat, setup=new_version
+            )
+    return results
+
+
+def bench_app(sizes):
+    """每個資料量在獨立的子 process 中量測，避免 st.cache_* 與背景 thread 跨資料量殘留"""
+    results = {}
+    for n in sizes:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), 'app-worker', str(n)],
+            capture_output=True, text=True, check=True, cwd=ROOT
+        ).stdout
+        results.update(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+
+def app_worker(n, reruns=APP_RERUNS):
+    """子 process：建立含 n 筆專案與 fixture 新聞的資料庫，以 AppTest 執行 app.py"""
+    from streamlit.testing.v1 import AppTest
+
+    with tempfile.TemporaryDirectory() as tmp, fixture_server() as base_url:
+        # app.py 使用相對路徑的 projects.db
+        os.chdir(tmp)
+        save_projects(make_projects(n))
+        save_feeds(fixture_feeds(base_url))
+        FeedRefresher().refresh_once()
+
+        at = AppTest.from_file(APP_FILE, default_timeout=120)
+        start = time.perf_counter()
+        at.run()
+        first_ms = (time.perf_counter() - start) * 1000
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+
+        samples = []
+        for _ in range(reruns):
+            start = time.perf_counter()
+            at.run()
+            samples.append((time.perf_counter() - start) * 1000)
+
+    print(json.dumps({
+        f"app_rerun.first[n={n}]": {'median_ms': round(first_ms, 3), 'min_ms': round(first_ms, 3)},
+        f"app_rerun.warm[n={n}]": {'median_ms': round(statistics.median(samples), 3), 'min_ms': round(min(samples), 3)},
+    }))
+
+
+# ==================== 報告 ====================
+
+def _git(*args):
+    try:
+        return subprocess.run(['git', *args], capture_output=True, text=True, check=True, cwd=ROOT).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes=SIZES, repeat=REPEAT, skip_app=False, out=None):
+    commit = _git('rev-parse', '--short', 'HEAD') or 'unknown'
+    report = {
+        'commit': commit,
+        'dirty': bool(_git('status', '--porcelain', '--untracked-files=no')),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'sizes': list(sizes),
+        'repeat': repeat,
+        'results': {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            print(f"projects n={n} ...", file=sys.stderr)
+            report['results'].update(bench_projects(n, repeat, tmp))
+        print("feeds ...", file=sys.stderr)
+        report['results'].update(bench_feeds(repeat, tmp))
+    print("startup ...", file=sys.stderr)
+    streamlit_ms, app_ms, _, _ = measure_startup(repeat)
+    report['results']['startup.import_streamlit'] = {'median_ms': round(streamlit_ms, 3), 'min_ms': round(streamlit_ms, 3)}
+    report['results']['startup.import_app_modules'] = {'median_ms': round(app_ms, 3), 'min_ms': round(app_ms, 3)}
+    if not skip_app:
+        print("app rerun ...", file=sys.stderr)
+        report['results'].update(bench_app(sizes))
+
+    out = out or os.path.join(REPORTS_DIR, f"{commit}{'-dirty' if report['dirty'] else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"{'benchmark':<42} {'median (ms)':>12} {'min (ms)':>10}")
+    for name, stats in report['results'].items():
+        print(f"{name:<42} {stats['median_ms']:>12.3f} {stats['min_ms']:>10.3f}")
+    print(f"\n報告已寫入 {out}")
+    return report
+
+
+def compare(base_file, head_file, threshold=THRESHOLD):
+    """比較兩份報告的中位數；回傳超過 threshold% 變慢的項目數"""
+    with open(base_file, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(head_file, encoding='utf-8') as f:
+        head = json.load(f)
+
+    print(f"base {base['commit']} ({base['timestamp']})  ->  head {head['commit']} ({head['timestamp']})")
+    print(f"{'benchmark':<42} {'base (ms)':>11} {'head (ms)':>11} {'change':>9}")
+    regressions = 0
+    for name, stats in head['results'].items():
+        if name not in base['results']:
+            print(f"{name:<42} {'-':>11} {stats['median_ms']:>11.3f} {'new':>9}")
+            continue
+        before = base['results'][name]['median_ms']
+        after = stats['median_ms']
+        change = (after - before) / before * 100 if before else 0.0
+        flag = ''
+        if change > threshold:
+            flag = '  ▲ slower'
+            regressions += 1
+        elif change < -threshold:
+            flag = '  ▼ faster'
+        print(f"{name:<42} {before:>11.3f} {after:>11.3f} {change:>+8.1f}%{flag}")
+    for name in base['results'].keys() - head['results'].keys():
+        print(f"{name:<42} {base['results'][name]['median_ms']:>11.3f} {'-':>11} {'removed':>9}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Morning Dashboard 基準測試套件")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = sub.add_parser('run', help="執行基準測試並輸出 JSON 報告")
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES), help="合成專案數量")
+    run_parser.add_argument('--repeat', type=int, default=REPEAT, help="每項量測的重複次數")
+    run_parser.add_argument('--skip-app', action='store_true', help="略過 AppTest 整頁 rerun 量測")
+    run_parser.add_argument('--out', help="報告路徑（預設 benchmarks/reports/<commit>.json）")
+
+    compare_parser = sub.add_parser('compare', help="比較兩份報告")
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('head')
+    compare_parser.add_argument('--threshold', type=float, default=THRESHOLD, help="視為退化的變慢百分比")
+
+    record_parser = sub.add_parser('record', help="從 feeds 資料表中的來源重新錄製 RSS fixtures")
+    record_parser.add_argument('--db', default=DB_FILE, help="SQLite 資料庫檔案")
+
+    worker_parser = sub.add_parser('app-worker', help=argparse.SUPPRESS)
+    worker_parser.add_argument('n', type=int)
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        run(args.sizes, args.repeat, args.skip_app, args.out)
+    elif args.command == 'compare':
+        return 1 if compare(args.base, args.head, args.threshold) else 0
+    elif args.command == 'record':
+        record_fixtures(args.db)
+    elif args.command == 'app-worker':
+        app_worker(args.n)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,270 @@
+import argparse
+import csv
+import io
+import json
+import sys
+from datetime import datetime
+
+from db import DB_FILE, DEFAULT_BOARD_ID, board_id_by_name, bulk_upsert, iter_projects, new_project_key
+
+# ==================== 專案大量匯入 / 匯出（JSON / JSONL / CSV） ====================
+
+FORMATS = ('json', 'jsonl', 'csv')
+FIELDS = ('key', 'name', 'start_date', 'end_date', 'progress', 'url')
+# 每個交易寫入的筆數
+BATCH_SIZE = 1000
+# 串流讀取 JSON 時每次讀入的字元數
+CHUNK_SIZE = 64 * 1024
+
+
+def detect_format(path):
+    """依副檔名判斷格式"""
+    ext = path.rsplit('.', 1)[-1].lower() if '.' in path else ''
+    if ext == 'ndjson':
+        return 'jsonl'
+    if ext not in FORMATS:
+        raise ValueError(f"無法從副檔名判斷格式：{path}（請指定 {', '.join(FORMATS)}）")
+    return ext
+
+
+# --- 讀取：每種格式都逐筆產生 record，不把整個檔案載入記憶體 ---
+# 無法解析的單筆資料以 ValueError 物件代替 record 產生，由 import_projects 記錄後略過
+def _iter_jsonl(fp):
+    for line_no, line in enumerate(fp, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            record = ValueError(f"JSON 格式錯誤：{e.msg}（第 {e.colno} 個字元）")
+        yield line_no, record
+
+
+def _iter_csv(fp):
+    reader = csv.DictReader(fp)
+    for record in reader:
+        yield reader.line_num, record
+
+
+def _iter_json(fp):
+    """逐一解析最外層 array 的元素，或 object 的 "key": {...} 配對（如 projects.json）"""
+    decoder = json.JSONDecoder()
+    buf = ''
+    pos = 0
+    eof = False
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = fp.read(CHUNK_SIZE)
+        eof = not chunk
+        buf = buf[pos:] + chunk
+        pos = 0
+        return not eof
+
+    def skip_ws():
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in ' \t\r\n':
+                pos += 1
+            if pos < len(buf) or not fill():
+                return buf[pos] if pos < len(buf) else ''
+
+    def decode():
+        nonlocal pos
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+                # 值剛好停在緩衝區結尾時可能被截斷（例如數字），再讀一段確認
+                if end < len(buf) or eof:
+                    pos = end
+                    return value
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            fill()
+
+    opening = skip_ws()
+    if not opening or opening not in '[{':
+        raise ValueError("JSON 檔案最外層必須是 array 或 object")
+    closing = ']' if opening == '[' else '}'
+    pos += 1
+    index = 0
+    while True:
+        ch = skip_ws()
+        if ch == closing:
+            return
+        if ch == ',' and index:
+            pos += 1
+            skip_ws()
+        elif index or not ch:
+            raise ValueError(f"JSON 格式錯誤（第 {index + 1} 筆附近）")
+        if opening == '{':
+            key = decode()
+            if skip_ws() != ':':
+                raise ValueError(f"JSON 格式錯誤（第 {index + 1} 筆附近）")
+            pos += 1
+            skip_ws()
+            record = decode()
+            if isinstance(record, dict):
+                record = {'key': key, **record}
+        else:
+            record = decode()
+        index += 1
+        yield index, record
+
+
+READERS = {'json': _iter_json, 'jsonl': _iter_jsonl, 'csv': _iter_csv}
+
+
+# --- 驗證 ---
+def _valid_date(value):
+    value = str(value or '').strip()
+    if value:
+        datetime.strptime(value, "%Y-%m-%d")  # 格式錯誤時拋出 ValueError
+    return value
+
+
+def validate_record(record):
+    """驗證並正規化一筆匯入資料，回傳 (key, data)；不合法時拋出 ValueError"""
+    if not isinstance(record, dict):
+        raise ValueError("每筆資料必須是 object")
+    name = str(record.get('name') or '').strip()
+    if not name:
+        raise ValueError("缺少專案名稱 (name)")
+    try:
+        start_date = _valid_date(record.get('start_date'))
+        end_date = _valid_date(record.get('end_date'))
+    except ValueError:
+        raise ValueError("日期格式必須為 YYYY-MM-DD")
+    if start_date and end_date and end_date < start_date:
+        raise ValueError("結束日期早於開始日期")
+    try:
+        progress = int(float(record.get('progress') or 0))
+    except (TypeError, ValueError):
+        raise ValueError("進度 (progress) 必須是數字")
+    if not 0 <= progress <= 100:
+        raise ValueError("進度 (progress) 必須介於 0 到 100")
+
+    key = str(record.get('key') or '').strip() or new_project_key()
+    return key, {
+        'name': name,
+        'start_date': start_date,
+        'end_date': end_date,
+        'progress': progress,
+        'url': str(record.get('url') or '').strip()
+    }
+
+
+# --- 匯入 / 匯出 ---
+def _read_records(reader, errors):
+    """包裝 READERS 的產生器；檔案結構本身損壞（無法再往下解析）時記錄錯誤並停止，而不是中斷整個匯入"""
+    position = 0
+    try:
+        for position, record in reader:
+            yield position, record
+    except (ValueError, csv.Error) as e:
+        errors.append((position + 1, f"檔案格式錯誤，之後的資料未匯入：{e}"))
+
+
+def import_projects(fp, fmt, batch_size=BATCH_SIZE, board_id=DEFAULT_BOARD_ID, db_file=DB_FILE):
+    """從文字串流匯入專案到指定看板，每 batch_size 筆一個交易
+
+    不合法或無法解析的資料會略過並記錄；回傳 (匯入筆數, [(位置, 錯誤訊息), ...])。
+    """
+    imported = 0
+    errors = []
+    # {key: (位置, data)}；位置用於回報被略過的 key
+    batch = {}
+
+    def flush():
+        nonlocal imported, batch
+        skipped = bulk_upsert({key: data for key, (_, data) in batch.items()}, board_id=board_id, db_file=db_file)
+        imported += len(batch) - len(skipped)
+        errors.extend((batch[key][0], f"key「{key}」已屬於其他看板，未匯入") for key in skipped)
+        batch = {}
+
+    for position, record in _read_records(READERS[fmt](fp), errors):
+        try:
+            if isinstance(record, ValueError):
+                raise record
+            key, data = validate_record(record)
+        except (TypeError, ValueError) as e:
+            errors.append((position, str(e)))
+            continue
+        batch[key] = (position, data)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return imported, errors
+
+
+def export_projects(fp, fmt, board_id=DEFAULT_BOARD_ID, db_file=DB_FILE):
+    """將看板的全部專案逐筆寫入文字串流（依結束日期排序），回傳筆數"""
+    count = 0
+    if fmt == 'csv':
+        writer = csv.DictWriter(fp, fieldnames=FIELDS)
+        writer.writeheader()
+    elif fmt == 'json':
+        fp.write('[')
+    for key, data in iter_projects(board_id, db_file=db_file):
+        record = {'key': key, **{field: data[field] for field in FIELDS[1:]}}
+        if fmt == 'csv':
+            writer.writerow(record)
+        elif fmt == 'json':
+            fp.write((',\n' if count else '\n') + json.dumps(record, ensure_ascii=False))
+        else:
+            fp.write(json.dumps(record, ensure_ascii=False) + '\n')
+        count += 1
+    if fmt == 'json':
+        fp.write('\n]\n')
+    return count
+
+
+# ==================== CLI ====================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Morning Dashboard 專案大量匯入 / 匯出")
+    parser.add_argument('--db', default=DB_FILE, help="資料庫檔案路徑")
+    parser.add_argument('--board', help="看板名稱（預設為預設看板）")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_import = sub.add_parser('import', help="匯入 JSON / JSONL / CSV")
+    p_import.add_argument('path', help="檔案路徑，- 代表標準輸入")
+    p_import.add_argument('--format', choices=FORMATS)
+    p_import.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    p_export = sub.add_parser('export', help="匯出為 JSON / JSONL / CSV")
+    p_export.add_argument('path', help="檔案路徑，- 代表標準輸出")
+    p_export.add_argument('--format', choices=FORMATS)
+
+    args = parser.parse_args(argv)
+    if args.path == '-' and not args.format:
+        parser.error("使用標準輸入/輸出時必須指定 --format")
+    fmt = args.format or detect_format(args.path)
+    board_id = DEFAULT_BOARD_ID
+    if args.board:
+        board_id = board_id_by_name(args.board, db_file=args.db)
+        if board_id is None:
+            parser.error(f"找不到看板：{args.board}")
+
+    if args.command == 'import':
+        fp = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig') if args.path == '-' else open(args.path, encoding='utf-8-sig', newline='')
+        with fp:
+            imported, errors = import_projects(fp, fmt, batch_size=args.batch_size, board_id=board_id, db_file=args.db)
+        for position, message in errors:
+            print(f"略過第 {position} 筆：{message}", file=sys.stderr)
+        print(f"已匯入 {imported} 筆，略過 {len(errors)} 筆", file=sys.stderr)
+        return 1 if errors and not imported else 0
+
+    fp = sys.stdout if args.path == '-' else open(args.path, 'w', encoding='utf-8', newline='')
+    try:
+        count = export_projects(fp, fmt, board_id=board_id, db_file=args.db)
+    finally:
+        if fp is not sys.stdout:
+            fp.close()
+    print(f"已匯出 {count} 筆", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
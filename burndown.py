@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+# ==================== 燃盡圖 / 速度 ====================
+
+# 可選的期間（天）
+BURNDOWN_RANGES = {'30 天': 30, '90 天': 90, '一年': 365}
+
+
+def velocity_summary(rows, days):
+    """期間內平均每日速度（進度點數）與依此速度推估的完成日；沒有資料或速度不為正時完成日為 None"""
+    if not rows:
+        return 0.0, None
+    velocity = sum(row['gained'] for row in rows) / days
+    remaining = rows[-1]['remaining']
+    if velocity <= 0 or remaining <= 0:
+        return velocity, None
+    return velocity, rows[-1]['date'] + timedelta(days=int(-(-remaining // velocity)))
+
+
+def build_burndown_figure(rows):
+    """由 db.progress_burndown 的結果建立燃盡圖：剩餘工作量（階梯線）與每日速度（長條，右軸）
+
+    rows 只包含有變動的日子，剩餘工作量以階梯線延續到下一筆。沒有資料時回傳 None。
+    """
+    if not rows:
+        return None
+
+    import plotly.graph_objects as go
+
+    dates = [row['date'] for row in rows]
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=dates, y=[row['gained'] for row in rows], name='速度（進度點數/日）',
+        marker_color='#4CAF50', opacity=0.5, yaxis='y2'
+    ))
+    fig.add_trace(go.Scatter(
+        x=dates, y=[row['remaining'] for row in rows], name='剩餘工作量',
+        mode='lines+markers', line=dict(color='#1f77b4', shape='hv'),
+        customdata=[[row['projects'], row['completed']] for row in rows],
+        hovertemplate='%{x|%Y-%m-%d}<br>剩餘 %{y}<br>專案 %{customdata[0]}，完成 %{customdata[1]}<extra></extra>'
+    ))
+    fig.update_layout(
+        height=300,
+        showlegend=True,
+        legend=dict(orientation='h', y=1.1),
+        xaxis=dict(showgrid=True, gridcolor='lightgray', type='date'),
+        yaxis=dict(title='剩餘', rangemode='tozero'),
+        yaxis2=dict(title='速度', overlaying='y', side='right', showgrid=False),
+        plot_bgcolor='white',
+        font=dict(family='Calibri', size=12),
+        margin=dict(l=0, r=0, t=30, b=0)
+    )
+    return fig
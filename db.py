@@ -0,0 +1,891 @@
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date, timedelta
+from pathlib import Path
+
+import streamlit as st
+
+from profiling import current_profiler
+
+# ==================== 專案資料持久化 ====================
+
+# 資料庫檔案路徑（用於儲存專案資料）
+DB_FILE = "projects.db"
+
+# 只有進度欄位變動時的 dirty 標記
+PROGRESS_ONLY = frozenset({'progress'})
+
+# 等待其他連線釋放寫入鎖的時間（毫秒）
+BUSY_TIMEOUT_MS = 5000
+
+# migration 9 建立的預設看板；既有專案與未指定看板的工具都使用它
+DEFAULT_BOARD_ID = 1
+
+
+# --- Schema 與 migration：每個 process 只在建立連線時執行一次 ---
+# 依序套用；PRAGMA user_version 記錄已套用到第幾個
+MIGRATIONS = [
+    # 1: 初始 schema
+    '''
+    CREATE TABLE IF NOT EXISTS projects (
+        key TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        start_date TEXT,
+        end_date TEXT,
+        progress INTEGER DEFAULT 0,
+        url TEXT
+    );
+    ''',
+    # 2: 新聞文章（背景抓取後寫入，以 source_url + guid 去重）
+    '''
+    CREATE TABLE IF NOT EXISTS articles (
+        id INTEGER PRIMARY KEY,
+        source_url TEXT NOT NULL,
+        guid TEXT NOT NULL,
+        title TEXT NOT NULL,
+        link TEXT,
+        summary TEXT,
+        html TEXT NOT NULL,
+        sort_ts REAL NOT NULL,
+        fetched_at REAL NOT NULL,
+        UNIQUE (source_url, guid)
+    );
+    CREATE INDEX IF NOT EXISTS idx_articles_source_sort ON articles (source_url, sort_ts DESC, id);
+    ''',
+    # 3: 日期欄位以 NULL 表示未填，並為排序/篩選建立索引
+    '''
+    UPDATE projects SET start_date = NULL WHERE start_date = '';
+    UPDATE projects SET end_date = NULL WHERE end_date = '';
+    CREATE INDEX IF NOT EXISTS idx_projects_end_sort ON projects (ifnull(end_date, '9999-12-31'), key);
+    CREATE INDEX IF NOT EXISTS idx_projects_open_end_sort ON projects (ifnull(end_date, '9999-12-31'), key) WHERE progress < 100;
+    CREATE INDEX IF NOT EXISTS idx_projects_start_date ON projects (start_date);
+    ''',
+    # 4: 樂觀鎖用的列版本
+    '''
+    ALTER TABLE projects ADD COLUMN version INTEGER NOT NULL DEFAULT 1;
+    ''',
+    # 5: 每個新聞來源預先渲染好的 HTML 區塊（依 feed 內容雜湊更新），文章本身只存純文字
+    '''
+    CREATE TABLE IF NOT EXISTS feed_blocks (
+        source_url TEXT PRIMARY KEY,
+        content_hash TEXT NOT NULL,
+        html TEXT NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    ALTER TABLE articles DROP COLUMN html;
+    ''',
+    # 6: 新聞來源設定（更新間隔秒數、顯示則數、是否啟用、版面位置），預設四個來源
+    '''
+    CREATE TABLE IF NOT EXISTS feeds (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        url TEXT NOT NULL UNIQUE,
+        refresh_interval INTEGER NOT NULL DEFAULT 3600,
+        max_entries INTEGER NOT NULL DEFAULT 10,
+        enabled INTEGER NOT NULL DEFAULT 1,
+        slot INTEGER NOT NULL DEFAULT 0,
+        last_fetched REAL
+    );
+    INSERT OR IGNORE INTO feeds (name, url, slot) VALUES
+        ('BBC 中文', 'https://feeds.bbci.co.uk/zhongwen/trad/rss.xml', 0),
+        ('德國之聲 (DW)', 'https://rss.dw.com/rdf/rss-chi-all', 1),
+        ('報導者 (The Reporter)', 'https://www.twreporter.org/a/rss2.xml', 2),
+        ('公視新聞 (PTS)', 'https://news.pts.org.tw/xml/newsfeed.xml', 3);
+    ''',
+    # 7: FTS5 全文檢索（trigram 斷詞，中文可做子字串搜尋），以 trigger 隨寫入增量更新
+    '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+        title, summary, link, content='articles', content_rowid='id', tokenize='trigram'
+    );
+    CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+        INSERT INTO articles_fts (rowid, title, summary, link) VALUES (new.id, new.title, new.summary, new.link);
+    END;
+    CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+        INSERT INTO articles_fts (articles_fts, rowid, title, summary, link) VALUES ('delete', old.id, old.title, old.summary, old.link);
+    END;
+    CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE OF title, summary, link ON articles BEGIN
+        INSERT INTO articles_fts (articles_fts, rowid, title, summary, link) VALUES ('delete', old.id, old.title, old.summary, old.link);
+        INSERT INTO articles_fts (rowid, title, summary, link) VALUES (new.id, new.title, new.summary, new.link);
+    END;
+    INSERT INTO articles_fts (articles_fts) VALUES ('rebuild');
+    -- 短詞改用 LIKE 時依時間由新到舊掃描，找到足夠筆數即停止
+    CREATE INDEX IF NOT EXISTS idx_articles_sort ON articles (sort_ts DESC);
+
+    -- projects 以 TEXT key 為主鍵（rowid 在 VACUUM 後可能改變），因此索引自帶內容並以 key 對應
+    CREATE VIRTUAL TABLE IF NOT EXISTS projects_fts USING fts5(key UNINDEXED, name, url, tokenize='trigram');
+    CREATE TRIGGER IF NOT EXISTS projects_fts_insert AFTER INSERT ON projects BEGIN
+        INSERT INTO projects_fts (key, name, url) VALUES (new.key, new.name, new.url);
+    END;
+    CREATE TRIGGER IF NOT EXISTS projects_fts_delete AFTER DELETE ON projects BEGIN
+        DELETE FROM projects_fts WHERE key = old.key;
+    END;
+    CREATE TRIGGER IF NOT EXISTS projects_fts_update AFTER UPDATE OF name, url ON projects BEGIN
+        DELETE FROM projects_fts WHERE key = old.key;
+        INSERT INTO projects_fts (key, name, url) VALUES (new.key, new.name, new.url);
+    END;
+    INSERT INTO projects_fts (key, name, url) SELECT key, name, url FROM projects;
+    ''',
+    # 8: 進度歷史（只在進度改變時附加，同一天只留最後的值；progress 為 NULL 表示專案已刪除）
+    #    與每日增量彙總（專案數、進度總和、完成數的變化量，以及既有專案的進度增加量 gained），
+    #    燃盡圖以累計和一次查詢取得
+    #    day 為本地時間 1970-01-01 起算的天數
+    '''
+    CREATE TABLE IF NOT EXISTS progress_history (
+        project_key TEXT NOT NULL,
+        day INTEGER NOT NULL,
+        progress INTEGER,
+        PRIMARY KEY (project_key, day)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_progress_history_day ON progress_history (day);
+    CREATE TABLE IF NOT EXISTS progress_daily (
+        day INTEGER PRIMARY KEY,
+        projects INTEGER NOT NULL DEFAULT 0,
+        progress INTEGER NOT NULL DEFAULT 0,
+        completed INTEGER NOT NULL DEFAULT 0,
+        gained INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE TRIGGER IF NOT EXISTS progress_history_insert AFTER INSERT ON projects BEGIN
+        INSERT INTO progress_history (project_key, day, progress)
+        VALUES (new.key, CAST(julianday('now', 'localtime') - 2440587.5 AS INTEGER), ifnull(new.progress, 0))
+        ON CONFLICT(project_key, day) DO UPDATE SET progress = excluded.progress;
+        INSERT INTO progress_daily (day, projects, progress, completed)
+        VALUES (CAST(julianday('now', 'localtime') - 2440587.5 AS INTEGER), 1, ifnull(new.progress, 0), ifnull(new.progress, 0) >= 100)
+        ON CONFLICT(day) DO UPDATE SET
+            projects = projects + excluded.projects,
+            progress = progress + excluded.progress,
+            completed = completed + excluded.completed;
+    END;
+    CREATE TRIGGER IF NOT EXISTS progress_history_update AFTER UPDATE OF progress ON projects
+    WHEN new.progress IS NOT old.progress BEGIN
+        INSERT INTO progress_history (project_key, day, progress)
+        VALUES (new.key, CAST(julianday('now', 'localtime') - 2440587.5 AS INTEGER), ifnull(new.progress, 0))
+        ON CONFLICT(project_key, day) DO UPDATE SET progress = excluded.progress;
+        INSERT INTO progress_daily (day, progress, completed, gained)
+        VALUES (
+            CAST(julianday('now', 'localtime') - 2440587.5 AS INTEGER),
+            ifnull(new.progress, 0) - ifnull(old.progress, 0),
+            (ifnull(new.progress, 0) >= 100) - (ifnull(old.progress, 0) >= 100),
+            ifnull(new.progress, 0) - ifnull(old.progress, 0)
+        )
+        ON CONFLICT(day) DO UPDATE SET
+            progress = progress + excluded.progress,
+            completed = completed + excluded.completed,
+            gained = gained + excluded.gained;
+    END;
+    CREATE TRIGGER IF NOT EXISTS progress_history_delete AFTER DELETE ON projects BEGIN
+        INSERT INTO progress_history (project_key, day, progress)
+        VALUES (old.key, CAST(julianday('now', 'localtime') - 2440587.5 AS INTEGER), NULL)
+        ON CONFLICT(project_key, day) DO UPDATE SET progress = excluded.progress;
+        INSERT INTO progress_daily (day, projects, progress, completed)
+        VALUES (CAST(julianday('now', 'localtime') - 2440587.5 AS INTEGER), -1, -ifnull(old.progress, 0), -(ifnull(old.progress, 0) >= 100))
+        ON CONFLICT(day) DO UPDATE SET
+            projects = projects + excluded.projects,
+            progress = progress + excluded.progress,
+            completed = completed + excluded.completed;
+    END;
+    -- 既有專案以目前進度作為歷史起點
+    INSERT OR IGNORE INTO progress_history (project_key, day, progress)
+    SELECT key, CAST(julianday('now', 'localtime') - 2440587.5 AS INTEGER), ifnull(progress, 0) FROM projects;
+    INSERT INTO progress_daily (day, projects, progress, completed)
+    SELECT CAST(julianday('now', 'localtime') - 2440587.5 AS INTEGER), count(*), sum(ifnull(progress, 0)), sum(ifnull(progress, 0) >= 100)
+    FROM projects HAVING count(*) > 0;
+    ''',
+    # 9: 看板：每個專案屬於一個看板（board_id），session 只讀寫自己看板的列；既有專案歸入預設看板 1
+    #    排序/篩選索引改以 board_id 開頭；每日進度彙總改為每個看板各自一列；
+    #    專案 FTS 的維護成本改為與單列相關，不隨整個 instance 的專案數成長
+    '''
+    CREATE TABLE IF NOT EXISTS boards (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE,
+        owner TEXT NOT NULL DEFAULT '',
+        created_at REAL NOT NULL DEFAULT (strftime('%s', 'now'))
+    );
+    INSERT OR IGNORE INTO boards (id, name) VALUES (1, '預設看板');
+    ALTER TABLE projects ADD COLUMN board_id INTEGER NOT NULL DEFAULT 1;
+    DROP INDEX IF EXISTS idx_projects_end_sort;
+    DROP INDEX IF EXISTS idx_projects_open_end_sort;
+    DROP INDEX IF EXISTS idx_projects_start_date;
+    CREATE INDEX IF NOT EXISTS idx_projects_board_end_sort ON projects (board_id, ifnull(end_date, '9999-12-31'), key);
+    CREATE INDEX IF NOT EXISTS idx_projects_board_open_end_sort ON projects (board_id, ifnull(end_date, '9999-12-31'), key) WHERE progress < 100;
+    CREATE INDEX IF NOT EXISTS idx_projects_board_start_date ON projects (board_id, start_date);
+
+    DROP TRIGGER IF EXISTS progress_history_insert;
+    DROP TRIGGER IF EXISTS progress_history_update;
+    DROP TRIGGER IF EXISTS progress_history_delete;
+    CREATE TABLE progress_board_daily (
+        board_id INTEGER NOT NULL,
+        day INTEGER NOT NULL,
+        projects INTEGER NOT NULL DEFAULT 0,
+        progress INTEGER NOT NULL DEFAULT 0,
+        completed INTEGER NOT NULL DEFAULT 0,
+        gained INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (board_id, day)
+    ) WITHOUT ROWID;
+    INSERT INTO progress_board_daily (board_id, day, projects, progress, completed, gained)
+    SELECT 1, day, projects, progress, completed, gained FROM progress_daily;
+    DROP TABLE progress_daily;
+    ALTER TABLE progress_board_daily RENAME TO progress_daily;
+
+    CREATE TRIGGER progress_history_insert AFTER INSERT ON projects BEGIN
+        INSERT INTO progress_history (project_key, day, progress)
+        VALUES (new.key, CAST(julianday('now', 'localtime') - 2440587.5 AS INTEGER), ifnull(new.progress, 0))
+        ON CONFLICT(project_key, day) DO UPDATE SET progress = excluded.progress;
+        INSERT INTO progress_daily (board_id, day, projects, progress, completed)
+        VALUES (new.board_id, CAST(julianday('now', 'localtime') - 2440587.5 AS INTEGER), 1, ifnull(new.progress, 0), ifnull(new.progress, 0) >= 100)
+        ON CONFLICT(board_id, day) DO UPDATE SET
+            projects = projects + excluded.projects,
+            progress = progress + excluded.progress,
+            completed = completed + excluded.completed;
+    END;
+    CREATE TRIGGER progress_history_update AFTER UPDATE OF progress ON projects
+    WHEN new.progress IS NOT old.progress AND new.board_id IS old.board_id BEGIN
+        INSERT INTO progress_history (project_key, day, progress)
+        VALUES (new.key, CAST(julianday('now', 'localtime') - 2440587.5 AS INTEGER), ifnull(new.progress, 0))
+        ON CONFLICT(project_key, day) DO UPDATE SET progress = excluded.progress;
+        INSERT INTO progress_daily (board_id, day, progress, completed, gained)
+        VALUES (
+            new.board_id,
+            CAST(julianday('now', 'localtime') - 2440587.5 AS INTEGER),
+            ifnull(new.progress, 0) - ifnull(old.progress, 0),
+            (ifnull(new.progress, 0) >= 100) - (ifnull(old.progress, 0) >= 100),
+            ifnull(new.progress, 0) - ifnull(old.progress, 0)
+        )
+        ON CONFLICT(board_id, day) DO UPDATE SET
+            progress = progress + excluded.progress,
+            completed = completed + excluded.completed,
+            gained = gained + excluded.gained;
+    END;
+    -- 專案移到其他看板：從舊看板的彙總扣除、加到新看板
+    CREATE TRIGGER progress_board_move AFTER UPDATE OF board_id ON projects
+    WHEN new.board_id IS NOT old.board_id BEGIN
+        INSERT INTO progress_history (project_key, day, progress)
+        SELECT new.key, CAST(julianday('now', 'localtime') - 2440587.5 AS INTEGER), ifnull(new.progress, 0) WHERE new.progress IS NOT old.progress
+        ON CONFLICT(project_key, day) DO UPDATE SET progress = excluded.progress;
+        INSERT INTO progress_daily (board_id, day, projects, progress, completed)
+        VALUES (old.board_id, CAST(julianday('now', 'localtime') - 2440587.5 AS INTEGER), -1, -ifnull(old.progress, 0), -(ifnull(old.progress, 0) >= 100))
+        ON CONFLICT(board_id, day) DO UPDATE SET
+            projects = projects + excluded.projects,
+            progress = progress + excluded.progress,
+            completed = completed + excluded.completed;
+        INSERT INTO progress_daily (board_id, day, projects, progress, completed)
+        VALUES (new.board_id, CAST(julianday('now', 'localtime') - 2440587.5 AS INTEGER), 1, ifnull(new.progress, 0), ifnull(new.progress, 0) >= 100)
+        ON CONFLICT(board_id, day) DO UPDATE SET
+            projects = projects + excluded.projects,
+            progress = progress + excluded.progress,
+            completed = completed + excluded.completed;
+    END;
+    CREATE TRIGGER progress_history_delete AFTER DELETE ON projects BEGIN
+        INSERT INTO progress_history (project_key, day, progress)
+        VALUES (old.key, CAST(julianday('now', 'localtime') - 2440587.5 AS INTEGER), NULL)
+        ON CONFLICT(project_key, day) DO UPDATE SET progress = excluded.progress;
+        INSERT INTO progress_daily (board_id, day, projects, progress, completed)
+        VALUES (old.board_id, CAST(julianday('now', 'localtime') - 2440587.5 AS INTEGER), -1, -ifnull(old.progress, 0), -(ifnull(old.progress, 0) >= 100))
+        ON CONFLICT(board_id, day) DO UPDATE SET
+            projects = projects + excluded.projects,
+            progress = progress + excluded.progress,
+            completed = completed + excluded.completed;
+    END;
+
+    -- projects_fts 原本以 UNINDEXED 的 key 刪除舊列，每次改名/刪除都掃描所有看板的索引；
+    -- 改以對照表記下每個 key 在 FTS 中的 rowid，且名稱與連結沒變時不更新
+    DROP TRIGGER IF EXISTS projects_fts_insert;
+    DROP TRIGGER IF EXISTS projects_fts_delete;
+    DROP TRIGGER IF EXISTS projects_fts_update;
+    CREATE TABLE IF NOT EXISTS projects_fts_rowids (key TEXT PRIMARY KEY, fts_rowid INTEGER NOT NULL) WITHOUT ROWID;
+    INSERT OR REPLACE INTO projects_fts_rowids (key, fts_rowid) SELECT key, rowid FROM projects_fts;
+    CREATE TRIGGER projects_fts_insert AFTER INSERT ON projects BEGIN
+        INSERT INTO projects_fts (key, name, url) VALUES (new.key, new.name, new.url);
+        INSERT INTO projects_fts_rowids (key, fts_rowid) VALUES (new.key, last_insert_rowid())
+        ON CONFLICT(key) DO UPDATE SET fts_rowid = excluded.fts_rowid;
+    END;
+    CREATE TRIGGER projects_fts_delete AFTER DELETE ON projects BEGIN
+        DELETE FROM projects_fts WHERE rowid = (SELECT fts_rowid FROM projects_fts_rowids WHERE key = old.key);
+        DELETE FROM projects_fts_rowids WHERE key = old.key;
+    END;
+    CREATE TRIGGER projects_fts_update AFTER UPDATE OF name, url ON projects
+    WHEN new.name IS NOT old.name OR new.url IS NOT old.url BEGIN
+        UPDATE projects_fts SET name = new.name, url = new.url
+        WHERE rowid = (SELECT fts_rowid FROM projects_fts_rowids WHERE key = old.key);
+    END;
+    ''',
+    # 10: 2 字詞索引。trigram 無法比對「台灣」「選舉」這類 2 字中文詞，原本只能退回 LIKE 全表掃描；
+    # 另建 contentless FTS5，內容為 bigram_text() 切出的相鄰 2 字元詞，以 unicode61 斷詞
+    # （bigram_text 是 _Connection 註冊的 SQL 函數；這裡的 trigger 由 migration 11 移除）
+    '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS articles_bigram USING fts5(title, summary, link, content='', tokenize='unicode61');
+    CREATE TRIGGER articles_bigram_insert AFTER INSERT ON articles BEGIN
+        INSERT INTO articles_bigram (rowid, title, summary, link)
+        VALUES (new.id, bigram_text(new.title), bigram_text(new.summary), bigram_text(new.link));
+    END;
+    CREATE TRIGGER articles_bigram_delete AFTER DELETE ON articles BEGIN
+        INSERT INTO articles_bigram (articles_bigram, rowid, title, summary, link)
+        VALUES ('delete', old.id, bigram_text(old.title), bigram_text(old.summary), bigram_text(old.link));
+    END;
+    CREATE TRIGGER articles_bigram_update AFTER UPDATE OF title, summary, link ON articles
+    WHEN new.title IS NOT old.title OR new.summary IS NOT old.summary OR new.link IS NOT old.link BEGIN
+        INSERT INTO articles_bigram (articles_bigram, rowid, title, summary, link)
+        VALUES ('delete', old.id, bigram_text(old.title), bigram_text(old.summary), bigram_text(old.link));
+        INSERT INTO articles_bigram (rowid, title, summary, link)
+        VALUES (new.id, bigram_text(new.title), bigram_text(new.summary), bigram_text(new.link));
+    END;
+    INSERT INTO articles_bigram (rowid, title, summary, link)
+    SELECT id, bigram_text(title), bigram_text(summary), bigram_text(link) FROM articles;
+    ''',
+    # 11: 呼叫 Python 函數的 trigger 讓其他連線（sqlite3 CLI、DB 瀏覽器）無法寫入 articles；
+    # 改為一般（儲存內容的）FTS5 表：新增/更新由 news.store_articles 寫入，刪除以純 SQL trigger 依 rowid 處理
+    '''
+    DROP TRIGGER IF EXISTS articles_bigram_insert;
+    DROP TRIGGER IF EXISTS articles_bigram_delete;
+    DROP TRIGGER IF EXISTS articles_bigram_update;
+    DROP TABLE IF EXISTS articles_bigram;
+    CREATE VIRTUAL TABLE articles_bigram USING fts5(title, summary, link, tokenize='unicode61');
+    INSERT INTO articles_bigram (rowid, title, summary, link)
+    SELECT id, bigram_text(title), bigram_text(summary), bigram_text(link) FROM articles;
+    CREATE TRIGGER articles_bigram_delete AFTER DELETE ON articles BEGIN
+        DELETE FROM articles_bigram WHERE rowid = old.id;
+    END;
+    ''',
+]
+
+# unicode61 斷詞視為詞的一部分的字元（字母、數字）；底線與標點都是分隔字元
+_WORD_RUN = re.compile(r'[^\W_]+')
+
+
+def bigram_text(value):
+    """將文字切成相鄰 2 字元的詞並以空白分隔（「台灣選舉」→「台灣 灣選 選舉」），供 articles_bigram 索引與查詢使用"""
+    if not value:
+        return ''
+    return ' '.join(run[i:i + 2] for run in _WORD_RUN.findall(value) for i in range(len(run) - 1))
+
+
+def _statements(script):
+    """將 migration 腳本切成單一 SQL 敘述（trigger 內的分號不會被切開）"""
+    statement = ''
+    for piece in script.split(';'):
+        statement += piece + ';'
+        if sqlite3.complete_statement(statement):
+            yield statement
+            statement = ''
+
+
+# 初始化資料庫
+def init_db(conn):
+    """初始化 SQLite 資料庫，套用尚未執行的 migration
+
+    多個 process 可能同時開啟舊版資料庫（例如 Streamlit 與排程的 snapshot.py）：
+    每個 migration 在 BEGIN IMMEDIATE 取得寫入鎖後重新讀取 user_version，已被其他 process 套用的就略過。
+    executescript 會先 commit 進行中的交易，因此改為逐句執行。
+    """
+    if conn.execute('PRAGMA user_version').fetchone()[0] >= len(MIGRATIONS):
+        return
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None
+    try:
+        while True:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                version = conn.execute('PRAGMA user_version').fetchone()[0]
+                if version >= len(MIGRATIONS):
+                    conn.execute('COMMIT')
+                    return
+                for statement in _statements(MIGRATIONS[version]):
+                    conn.execute(statement)
+                conn.execute(f'PRAGMA user_version = {version + 1}')
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+    finally:
+        conn.isolation_level = isolation_level
+
+
+class _Connection:
+    """跨 Streamlit script thread 共用的連線，寫入與讀取以 lock 序列化"""
+
+    def __init__(self, db_file):
+        self.conn = sqlite3.connect(db_file, check_same_thread=False, timeout=BUSY_TIMEOUT_MS / 1000)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}')
+        # migration 10/11 一次性建立 2 字詞索引時使用（schema 中不再有呼叫它的 trigger）
+        self.conn.create_function('bigram_text', 1, bigram_text, deterministic=True)
+        self.lock = threading.RLock()
+        # 本 process 內的寫入次數；同一條連線的寫入不會改變 PRAGMA data_version
+        self.revision = 0
+        init_db(self.conn)
+
+
+# CLI、快照與 benchmark 在 Streamlit runtime 之外呼叫 get_connection（st.cache_resource）時的 bare mode 警告
+logging.getLogger('streamlit.runtime.scriptrunner_utils.script_run_context').setLevel(logging.ERROR)
+
+
+@st.cache_resource
+def get_connection(db_file=DB_FILE):
+    """取得該資料庫檔案在此 process 中共用的長效連線"""
+    return _Connection(db_file)
+
+
+@contextmanager
+def transaction(db_file=DB_FILE):
+    """取得 cursor；區塊結束時 commit，發生例外則 rollback"""
+    shared = get_connection(db_file)
+    profiler = current_profiler()
+    with shared.lock:
+        changes = shared.conn.total_changes
+        with shared.conn:
+            yield profiler.cursor(shared.conn) if profiler else shared.conn.cursor()
+        if shared.conn.total_changes != changes:
+            shared.revision += 1
+
+
+# 每次 IN (...) 最多帶入的參數數量，避免超過 SQLite 的參數數量上限
+IN_CHUNK_SIZE = 500
+
+
+def select_in(c, sql, values, params=()):
+    """分批執行含 IN ({marks}) 的查詢並逐列回傳；params 為放在 IN 清單之前的參數"""
+    values = list(values)
+    for i in range(0, len(values), IN_CHUNK_SIZE):
+        chunk = values[i:i + IN_CHUNK_SIZE]
+        c.execute(sql.format(marks=",".join("?" * len(chunk))), [*params, *chunk])
+        yield from c.fetchall()
+
+
+def db_revision(db_file=DB_FILE):
+    """資料庫的變更版本，值不同代表有人寫入過
+
+    由 PRAGMA data_version（其他連線/process 的 commit）與本 process 的寫入次數組成，
+    查詢成本極低，可在每次 rerun 時輪詢。
+    """
+    shared = get_connection(db_file)
+    with shared.lock:
+        return shared.conn.execute('PRAGMA data_version').fetchone()[0], shared.revision
+
+
+class ConflictError(Exception):
+    """樂觀鎖衝突：專案在讀取後已被其他 session 修改或刪除"""
+
+    def __init__(self, keys):
+        super().__init__(f"專案已被其他使用者修改：{', '.join(keys)}")
+        self.keys = list(keys)
+
+
+# --- 看板：專案依 board_id 分區，讀寫都只涉及單一看板的列 ---
+def load_boards(db_file=DB_FILE):
+    """全部看板 [{'id', 'name', 'owner'}]，依建立順序"""
+    with transaction(db_file) as c:
+        c.execute('SELECT id, name, owner FROM boards ORDER BY id')
+        rows = c.fetchall()
+    return [{'id': board_id, 'name': name, 'owner': owner} for board_id, name, owner in rows]
+
+
+def board_id_by_name(name, db_file=DB_FILE):
+    """依名稱找看板 id，不存在時回傳 None"""
+    with transaction(db_file) as c:
+        c.execute('SELECT id FROM boards WHERE name = ?', (name,))
+        row = c.fetchone()
+    return row[0] if row else None
+
+
+def create_board(name, owner='', db_file=DB_FILE):
+    """新增看板並回傳 id；名稱重複時拋出 ValueError"""
+    name = name.strip()
+    if not name:
+        raise ValueError("看板名稱不可為空")
+    try:
+        with transaction(db_file) as c:
+            c.execute('INSERT INTO boards (name, owner) VALUES (?, ?)', (name, owner.strip()))
+            return c.lastrowid
+    except sqlite3.IntegrityError:
+        raise ValueError(f"看板名稱已存在：{name}") from None
+
+
+def board_summary(today=None, db_file=DB_FILE):
+    """所有看板的彙總（專案數、完成、逾期、本週到期、平均進度），單一 GROUP BY 查詢
+
+    逐看板走 board_id 開頭的索引，不把任何專案列讀進 Python。
+    """
+    today = today or date.today()
+    with transaction(db_file) as c:
+        c.execute(f'''
+            SELECT b.id, b.name, b.owner,
+                   count(p.key),
+                   ifnull(sum(p.progress >= 100), 0),
+                   ifnull(sum({END_SORT} < :today AND p.progress < 100), 0),
+                   ifnull(sum({END_SORT} BETWEEN :today AND :week_end AND p.progress < 100), 0),
+                   avg(p.progress)
+            FROM boards b
+            LEFT JOIN projects p ON p.board_id = b.id
+            GROUP BY b.id
+            ORDER BY b.id
+        ''', {'today': str(today), 'week_end': str(today + timedelta(days=6))})
+        rows = c.fetchall()
+    return [
+        {
+            'id': board_id, 'name': name, 'owner': owner, 'projects': projects, 'completed': completed,
+            'overdue': overdue, 'due_this_week': due_this_week, 'avg_progress': round(avg_progress or 0, 1)
+        }
+        for board_id, name, owner, projects, completed, overdue, due_this_week, avg_progress in rows
+    ]
+
+
+def new_project_key():
+    """產生不會碰撞的專案 key：時間前綴（依建立順序排序）加上隨機碼"""
+    return f"project_{time.time_ns():x}_{uuid.uuid4().hex[:12]}"
+
+
+def _project_row(key, data):
+    """將專案 dict 轉為 INSERT 用的欄位 tuple"""
+    return (
+        key,
+        data.get('name', ''),
+        data.get('start_date') or None,
+        data.get('end_date') or None,
+        data.get('progress', 0),
+        data.get('url', '')
+    )
+
+
+# _project_dict 對應的欄位順序
+PROJECT_COLUMNS = 'key, name, start_date, end_date, progress, url, version'
+
+
+def _project_dict(row):
+    """將 SELECT PROJECT_COLUMNS 的一列轉為專案 dict"""
+    key, name, start_date, end_date, progress, url, version = row
+    return {
+        'name': name,
+        'start_date': start_date or '',
+        'end_date': end_date or '',
+        'progress': progress or 0,
+        'url': url or '',
+        'version': version
+    }
+
+
+# 載入專案資料的函數
+def load_projects(board_id=DEFAULT_BOARD_ID, db_file=DB_FILE):
+    """從資料庫載入一個看板的專案資料"""
+    try:
+        with transaction(db_file) as c:
+            c.execute(f'SELECT {PROJECT_COLUMNS} FROM projects WHERE board_id = ?', (board_id,))
+            rows = c.fetchall()
+
+        return {row[0]: _project_dict(row) for row in rows}
+    except Exception as e:
+        st.error(f"載入專案資料時發生錯誤：{str(e)}")
+        return {}
+
+
+# --- 查詢下推：排序、篩選與分頁交給 SQLite（使用 migration 9 以 board_id 開頭的索引） ---
+# 與 idx_projects_board_end_sort 相同的排序運算式；沒有結束日期的排最後
+END_SORT = "ifnull(end_date, '9999-12-31')"
+
+# Tracking 檢視：名稱 -> WHERE 條件（:today 與 :week_end 為 YYYY-MM-DD）
+PROJECT_VIEWS = {
+    'all': "1",
+    'overdue': f"{END_SORT} < :today AND progress < 100",
+    'due_this_week': f"{END_SORT} BETWEEN :today AND :week_end AND progress < 100",
+    'active_today': f"start_date <= :today AND {END_SORT} >= :today",
+}
+
+
+def _view_where(view, today, name_filter, board_id):
+    """組出 WHERE 子句與參數"""
+    where = f"board_id = :board_id AND {PROJECT_VIEWS[view]}"
+    params = {'board_id': board_id, 'today': str(today), 'week_end': str(today + timedelta(days=6))}
+    if name_filter:
+        escaped = name_filter.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        where += " AND name LIKE :name ESCAPE '\\'"
+        params['name'] = f"%{escaped}%"
+    return where, params
+
+
+def query_projects(view='all', today=None, name_filter='', limit=-1, offset=0, board_id=DEFAULT_BOARD_ID, db_file=DB_FILE):
+    """依結束日期排序取出看板中的一頁專案，回傳 [(key, data), ...]"""
+    where, params = _view_where(view, today or date.today(), name_filter, board_id)
+    params.update(limit=limit, offset=offset)
+    with transaction(db_file) as c:
+        c.execute(f'''
+            SELECT {PROJECT_COLUMNS} FROM projects
+            WHERE {where}
+            ORDER BY {END_SORT}, key
+            LIMIT :limit OFFSET :offset
+        ''', params)
+        rows = c.fetchall()
+    return [(row[0], _project_dict(row)) for row in rows]
+
+
+def count_projects(view='all', today=None, name_filter='', board_id=DEFAULT_BOARD_ID, db_file=DB_FILE):
+    """看板中符合檢視條件的專案數"""
+    where, params = _view_where(view, today or date.today(), name_filter, board_id)
+    with transaction(db_file) as c:
+        c.execute(f'SELECT count(*) FROM projects WHERE {where}', params)
+        return c.fetchone()[0]
+
+
+def projects_fingerprint(projects):
+    """專案資料的內容雜湊，內容相同即相同，供畫面快取作為 key"""
+    payload = json.dumps(projects, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+# --- 單列操作：只寫入有變動的專案 ---
+# 專案 dict 的 'version'：缺少時直接覆寫（匯入等工具用）；0 代表尚未寫入的新專案；
+# 其餘為讀取時的列版本，更新/刪除時以 compare-and-swap 檢查，不符即為衝突。
+# 所有寫入都限定在 board_id 所指的看板；其他看板的同 key 專案不會被修改
+def _upsert(c, projects, keys, board_id):
+    """新增或覆寫專案（不檢查版本）；key 已屬於其他看板的不寫入，依 keys 的順序回傳這些 key"""
+    keys = list(keys)
+    foreign = {row[0] for row in select_in(c, 'SELECT key FROM projects WHERE board_id != ? AND key IN ({marks})', keys, (board_id,))}
+    c.executemany('''
+        INSERT INTO projects (key, name, start_date, end_date, progress, url, board_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(key) DO UPDATE SET
+            name = excluded.name,
+            start_date = excluded.start_date,
+            end_date = excluded.end_date,
+            progress = excluded.progress,
+            url = excluded.url,
+            version = version + 1
+    ''', [_project_row(key, projects[key]) + (board_id,) for key in keys if key not in foreign])
+    return [key for key in keys if key in foreign]
+
+
+def _insert(c, key, data, board_id):
+    """新增專案；key 已存在時回傳 False"""
+    try:
+        c.execute('''
+            INSERT INTO projects (key, name, start_date, end_date, progress, url, version, board_id)
+            VALUES (?, ?, ?, ?, ?, ?, 1, ?)
+        ''', _project_row(key, data) + (board_id,))
+    except sqlite3.IntegrityError:
+        return False
+    return True
+
+
+def _update(c, key, data, board_id):
+    """以 compare-and-swap 更新整列；版本不符時回傳 False"""
+    c.execute('''
+        UPDATE projects SET name = ?, start_date = ?, end_date = ?, progress = ?, url = ?, version = version + 1
+        WHERE key = ? AND version = ? AND board_id = ?
+    ''', _project_row(key, data)[1:] + (key, data['version'], board_id))
+    return c.rowcount == 1
+
+
+def _update_progress(c, key, data, board_id):
+    """以 compare-and-swap 只更新進度；版本不符時回傳 False"""
+    c.execute(
+        'UPDATE projects SET progress = ?, version = version + 1 WHERE key = ? AND version = ? AND board_id = ?',
+        (data.get('progress', 0), key, data['version'], board_id)
+    )
+    return c.rowcount == 1
+
+
+def _delete(c, key, version, board_id):
+    """刪除專案；version 為 None 時不檢查版本。已不存在視為成功，版本不符回傳 False"""
+    if version is None:
+        c.execute('DELETE FROM projects WHERE key = ? AND board_id = ?', (key, board_id))
+        return True
+    c.execute('DELETE FROM projects WHERE key = ? AND version = ? AND board_id = ?', (key, version, board_id))
+    if c.rowcount == 1:
+        return True
+    c.execute('SELECT 1 FROM projects WHERE key = ? AND board_id = ?', (key, board_id))
+    return c.fetchone() is None
+
+
+def upsert_projects(projects, keys=None, board_id=DEFAULT_BOARD_ID, db_file=DB_FILE):
+    """新增或更新指定的專案（keys 為 None 時處理全部）"""
+    save_projects(projects, dirty=dict.fromkeys(projects if keys is None else keys), board_id=board_id, db_file=db_file)
+
+
+def update_progress(project_key, progress, version=None, board_id=DEFAULT_BOARD_ID, db_file=DB_FILE):
+    """只更新單一專案的進度（單一 UPDATE）"""
+    data = {'progress': progress}
+    if version is not None:
+        data['version'] = version
+    save_projects({project_key: data}, dirty={project_key: PROGRESS_ONLY}, board_id=board_id, db_file=db_file)
+
+
+def delete_projects(keys, board_id=DEFAULT_BOARD_ID, db_file=DB_FILE):
+    """刪除指定的專案"""
+    save_projects({}, dirty={}, deleted=keys, board_id=board_id, db_file=db_file)
+
+
+def load_changed_projects(known_versions, board_id=DEFAULT_BOARD_ID, db_file=DB_FILE):
+    """與 session 中的 {key: version} 比對，只讀取看板中有變動的列
+
+    回傳 (有變動或新增的 {key: data}, 已被刪除（或移出看板）的 key 集合)。
+    """
+    with transaction(db_file) as c:
+        c.execute('SELECT key, version FROM projects WHERE board_id = ?', (board_id,))
+        current = dict(c.fetchall())
+        changed_keys = [key for key, version in current.items() if known_versions.get(key) != version]
+        changed = {
+            row[0]: _project_dict(row)
+            for row in select_in(c, f'SELECT {PROJECT_COLUMNS} FROM projects WHERE key IN ({{marks}})', changed_keys)
+        }
+    return changed, known_versions.keys() - current.keys()
+
+
+# --- 進度歷史（migration 8 的 trigger 在每次進度變動時寫入） ---
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _day_number(d):
+    """date 轉為 progress_history/progress_daily 的 day（1970-01-01 起算的天數）"""
+    return d.toordinal() - _EPOCH_ORDINAL
+
+
+def _day_date(day):
+    return date.fromordinal(day + _EPOCH_ORDINAL)
+
+
+def progress_burndown(start, end, board_id=None, db_file=DB_FILE):
+    """start～end（含）之間每個有變動的日子結束時，看板（board_id 為 None 時為全部看板）的狀態，單一查詢
+
+    start 之前已有紀錄時，第一筆為 start 當天的狀態。
+
+    從每日增量彙總累計出當天的專案數、完成數與剩餘工作量（各專案 100 - 進度 的總和），
+    gained 為既有專案當天增加的進度點數（速度，不含新增/刪除專案）。
+    沒有變動的日子不會出現，狀態與前一筆相同。
+    """
+    first, last = _day_number(start), _day_number(end)
+    with transaction(db_file) as c:
+        # start 之前最後一筆狀態作為期間起點（日期移到 start，速度不計入）
+        c.execute('''
+            SELECT max(day, :first), projects, completed, remaining, CASE WHEN day < :first THEN 0 ELSE gained END
+            FROM (
+                SELECT day,
+                       sum(projects) OVER running AS projects,
+                       sum(completed) OVER running AS completed,
+                       100 * sum(projects) OVER running - sum(progress) OVER running AS remaining,
+                       gained
+                FROM (
+                    SELECT day, sum(projects) AS projects, sum(progress) AS progress,
+                           sum(completed) AS completed, sum(gained) AS gained
+                    FROM progress_daily
+                    WHERE (:board_id IS NULL OR board_id = :board_id) AND day <= :last
+                    GROUP BY day
+                )
+                WINDOW running AS (ORDER BY day)
+            )
+            WHERE day >= (
+                SELECT ifnull(max(day), :first) FROM progress_daily
+                WHERE (:board_id IS NULL OR board_id = :board_id) AND day <= :first
+            )
+            ORDER BY day
+        ''', {'first': first, 'last': last, 'board_id': board_id})
+        rows = c.fetchall()
+    return [
+        {'date': _day_date(day), 'projects': projects, 'completed': completed, 'remaining': remaining, 'gained': gained}
+        for day, projects, completed, remaining, gained in rows
+    ]
+
+
+def project_history(key, start=None, end=None, db_file=DB_FILE):
+    """單一專案在期間內的進度變化 [(date, progress)]；progress 為 None 表示當天被刪除"""
+    with transaction(db_file) as c:
+        c.execute(
+            'SELECT day, progress FROM progress_history WHERE project_key = ? AND day BETWEEN ? AND ? ORDER BY day',
+            (key, _day_number(start) if start else 0, _day_number(end) if end else _day_number(date.max))
+        )
+        rows = c.fetchall()
+    return [(_day_date(day), progress) for day, progress in rows]
+
+
+# --- 大量匯入/匯出 ---
+def bulk_upsert(projects, board_id=DEFAULT_BOARD_ID, db_file=DB_FILE):
+    """在單一交易中 upsert 一批專案；與 save_projects 不同，錯誤會直接拋出給呼叫端
+
+    key 已屬於其他看板的專案不會寫入；回傳這些被略過的 key（依 projects 的順序）。
+    """
+    with transaction(db_file) as c:
+        return _upsert(c, projects, projects, board_id)
+
+
+def iter_projects(board_id=DEFAULT_BOARD_ID, db_file=DB_FILE, batch_size=1000):
+    """逐批讀出看板的全部專案 (key, data)，記憶體用量只與 batch_size 有關
+
+    使用獨立的唯讀連線，匯出期間不會佔住共用連線的 lock（WAL 模式下讀寫互不阻擋）。
+    """
+    get_connection(db_file)  # 確保 schema/migration 已套用
+    conn = sqlite3.connect(Path(db_file).resolve().as_uri() + '?mode=ro', uri=True)
+    try:
+        c = conn.execute(
+            f'SELECT {PROJECT_COLUMNS} FROM projects WHERE board_id = ? ORDER BY {END_SORT}, key', (board_id,)
+        )
+        while True:
+            rows = c.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield row[0], _project_dict(row)
+    finally:
+        conn.close()
+
+
+# 儲存專案資料的函數
+def save_projects(projects, dirty=None, deleted=(), board_id=DEFAULT_BOARD_ID, db_file=DB_FILE):
+    """將一個看板的專案資料儲存到資料庫
+
+    dirty 為 {key: 變動欄位集合或 None}，只寫入這些列；僅進度變動的列走單欄位 UPDATE。
+    dirty 為 None 時整個看板同步：刪除看板中已不存在的列並 upsert 全部專案。
+    deleted 為 key 的集合，或 {key: 讀取時的 version}（刪除時檢查版本）。
+    任一列發生版本衝突（或 key 已屬於其他看板）時整個交易 rollback 並拋出 ConflictError；
+    成功後 projects 中對應 dict 的 'version' 會更新為資料庫中的新版本。
+    """
+    try:
+        new_versions = {}
+        with transaction(db_file) as c:
+            if dirty is None:
+                c.execute('SELECT key FROM projects WHERE board_id = ?', (board_id,))
+                deleted = {row[0] for row in c.fetchall()} - projects.keys()
+                dirty = dict.fromkeys(projects)
+            if not isinstance(deleted, dict):
+                deleted = dict.fromkeys(deleted)
+
+            conflicts = []
+            force_keys = []
+            for key, fields in dirty.items():
+                if key not in projects:
+                    continue
+                data = projects[key]
+                version = data.get('version')
+                if version is None:
+                    force_keys.append(key)
+                    continue
+                if version == 0:
+                    ok = _insert(c, key, data, board_id)
+                elif fields == PROGRESS_ONLY:
+                    ok = _update_progress(c, key, data, board_id)
+                else:
+                    ok = _update(c, key, data, board_id)
+                if ok:
+                    new_versions[key] = version + 1
+                else:
+                    conflicts.append(key)
+
+            if force_keys:
+                # key 已屬於其他看板時不會寫入，與版本衝突同樣回報
+                conflicts.extend(_upsert(c, projects, force_keys, board_id))
+            for key, version in deleted.items():
+                if not _delete(c, key, version, board_id):
+                    conflicts.append(key)
+
+            if conflicts:
+                raise ConflictError(conflicts)
+
+        for key, version in new_versions.items():
+            projects[key]['version'] = version
+    except ConflictError:
+        raise
+    except Exception as e:
+        st.error(f"儲存專案資料時發生錯誤：{str(e)}")
@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+
+# plotly 只在實際畫圖時載入（見 build_gantt_figure），沒有專案時不付出 import 成本
+
+# ==================== Gantt 圖 ====================
+
+# 每列的高度（像素），圖表最小高度
+ROW_HEIGHT = 40
+MIN_HEIGHT = 300
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d')
+    except (TypeError, ValueError):
+        return None
+
+
+def _progress(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def gantt_rows(projects):
+    """將專案 dict 轉成 Gantt 用的列（純 Python，不需要 pandas）
+
+    每列為 {'Task', 'Start', 'End', 'Completed', 'Progress'}；缺少或無法解析日期的專案會被略過。
+    """
+    rows = []
+    for data in projects.values():
+        start = _parse_date(data.get('start_date'))
+        end = _parse_date(data.get('end_date'))
+        if start is None or end is None:
+            continue
+        progress = _progress(data.get('progress'))
+        # 已完成天數 = int(總天數 * 進度 / 100)（向 0 取整）
+        completed_days = int((end - start).days * progress / 100)
+        rows.append({
+            'Task': data.get('name') or '未命名專案',
+            'Start': start,
+            'End': end,
+            'Completed': start + timedelta(days=completed_days),
+            'Progress': progress
+        })
+    return rows
+
+
+def build_gantt_figure(projects, today_date):
+    """建立 Gantt 圖；不論專案數量，trace 數量固定
+
+    進度條與剩餘條各為一個水平 go.Bar（以 base= 指定起點），百分比文字為一個文字 trace。
+    沒有任何有效日期的專案時回傳 None。
+    """
+    rows = gantt_rows(projects)
+    if not rows:
+        return None
+
+    import plotly.graph_objects as go
+
+    tasks = [row['Task'] for row in rows]
+    # 日期軸上的 Bar 長度以毫秒表示
+    completed_ms = [(row['Completed'] - row['Start']).total_seconds() * 1000 for row in rows]
+    remaining_ms = [max(timedelta(0), row['End'] - row['Completed']).total_seconds() * 1000 for row in rows]
+    mid_dates = [row['Start'] + (row['End'] - row['Start']) / 2 for row in rows]
+
+    fig = go.Figure()
+    # 進度條（綠色）
+    fig.add_trace(go.Bar(
+        y=tasks, x=completed_ms, base=[row['Start'] for row in rows], orientation='h',
+        marker_color='#4CAF50', hoverinfo='skip'
+    ))
+    # 剩餘條（灰色）
+    fig.add_trace(go.Bar(
+        y=tasks, x=remaining_ms, base=[row['Completed'] for row in rows], orientation='h',
+        marker_color='#E0E0E0', hoverinfo='skip'
+    ))
+    # 進度百分比文字
+    fig.add_trace(go.Scatter(
+        x=mid_dates, y=tasks, mode='text', text=[f"{row['Progress']}%" for row in rows],
+        textfont=dict(size=10, color='black'), hoverinfo='skip'
+    ))
+
+    # Today 虛線
+    today_datetime = datetime.combine(today_date, datetime.min.time())
+    fig.update_layout(
+        height=max(MIN_HEIGHT, len(rows) * ROW_HEIGHT),
+        showlegend=False,
+        barmode='overlay',
+        xaxis=dict(showgrid=True, gridcolor='lightgray', type='date'),
+        yaxis=dict(showgrid=False),
+        plot_bgcolor='white',
+        font=dict(family='Calibri', size=12),
+        margin=dict(l=0, r=0, t=0, b=0)
+    )
+    fig.add_shape(type="line", x0=today_datetime, x1=today_datetime, y0=-0.5, y1=len(rows) - 0.5, line=dict(color="blue", width=2, dash="dash"))
+    fig.add_annotation(x=today_datetime, y=len(rows) - 0.5, text="Today", showarrow=False, font=dict(size=10, color='blue'), bgcolor="white", bordercolor="blue", borderwidth=1)
+    return fig
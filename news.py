@@ -0,0 +1,408 @@
+import calendar
+import hashlib
+import html
+import json
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+
+from db import DB_FILE, bigram_text, select_in, transaction
+
+# ==================== RSS 抓取（並行 + 條件式請求） ====================
+
+# 每個來源的預設逾時秒數（fetch_feeds 的來源 dict 可帶 'timeout' 覆寫；feeds 資料表沒有此欄位）
+FETCH_TIMEOUT = 10
+# 每個來源預設保留的新聞則數（可在 feeds 資料表中個別設定）
+MAX_ENTRIES = 10
+
+USER_AGENT = "MorningDashboard/1.0 (+feedparser)"
+# 每個來源最近一次抓取的狀態：{url: {'status': 200/304/'error', 'latency_ms', 'fetched_at'}}
+FETCH_STATS = {}
+# 預設的更新間隔秒數（可在 feeds 資料表中個別設定）
+REFRESH_INTERVAL = 3600
+# 背景 thread 最長多久重新讀取一次來源設定
+POLL_INTERVAL = 60
+# 抓取失敗的來源多久後重試（不超過該來源的更新間隔）
+RETRY_INTERVAL = 300
+# 同時抓取的來源數上限
+MAX_WORKERS = 8
+
+
+def fetch_feed(url, state, timeout=FETCH_TIMEOUT, max_entries=MAX_ENTRIES):
+    """下載並解析單一 RSS
+
+    state 為 {url: {'etag', 'modified', 'entries', 'max_entries'}}，由呼叫端跨次保存。
+    帶上 ETag/Last-Modified 發送條件式請求，伺服器回 304 時直接沿用上次的解析結果；
+    網路錯誤或逾時時回傳上次成功的資料（沒有則為空 list）。
+    """
+    cached = state.get(url)
+    # 快取的 entries 已依當時的則數截斷；則數改變後不能沿用，改發一般請求重新解析
+    if cached and cached.get('max_entries') != max_entries:
+        cached = None
+    request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+    if cached:
+        if cached.get('etag'):
+            request.add_header('If-None-Match', cached['etag'])
+        if cached.get('modified'):
+            request.add_header('If-Modified-Since', cached['modified'])
+
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            body = response.read()
+            headers = {k.lower(): v for k, v in response.headers.items()}
+            status = response.status
+    except Exception as e:
+        # 304 Not Modified 也會以 HTTPError 形式拋出，同樣沿用快取
+        status = 304 if getattr(e, 'code', None) == 304 else 'error'
+        _record_fetch(url, status, started)
+        return cached['entries'] if cached else []
+    _record_fetch(url, status, started)
+
+    # feedparser 只在背景 thread 實際解析時才載入，不拖慢 app 的冷啟動
+    import feedparser
+
+    try:
+        feed = feedparser.parse(body, response_headers=headers)
+        entries = feed.entries[:max_entries]
+    except Exception:
+        _record_fetch(url, 'error', started)
+        return cached['entries'] if cached else []
+
+    state[url] = {
+        'etag': headers.get('etag'),
+        'modified': headers.get('last-modified'),
+        'entries': entries,
+        'max_entries': max_entries
+    }
+    return entries
+
+
+def _record_fetch(url, status, started):
+    FETCH_STATS[url] = {
+        'status': status,
+        'latency_ms': round((time.perf_counter() - started) * 1000, 1),
+        'fetched_at': time.time()
+    }
+
+
+def fetch_feeds(sources, state):
+    """並行抓取多個來源，回傳 {url: entries}
+
+    sources 為 [{'url': ..., 'timeout': 選填, 'max_entries': 選填}, ...]；
+    最多 MAX_WORKERS 個來源同時抓取；來源數不超過此值時總耗時約為最慢的單一來源，而非全部相加。
+    """
+    urls = [source['url'] for source in sources]
+    if not urls:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(len(urls), MAX_WORKERS)) as pool:
+        futures = {
+            source['url']: pool.submit(
+                fetch_feed, source['url'], state,
+                source.get('timeout', FETCH_TIMEOUT), source.get('max_entries', MAX_ENTRIES)
+            )
+            for source in sources
+        }
+        return {url: future.result() for url, future in futures.items()}
+
+
+# ==================== HTML 轉文字與預先渲染 ====================
+
+# 摘要顯示的最大字數
+SUMMARY_LENGTH = 60
+
+
+class _TextExtractor(HTMLParser):
+    """只收集文字節點，略過 script/style 內容；實體（&amp; 等）會被還原"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ('script', 'style'):
+            self._skip += 1
+
+    def handle_endtag(self, tag):
+        if tag in ('script', 'style') and self._skip:
+            self._skip -= 1
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(data)
+
+
+def html_to_text(markup):
+    """將 RSS 內的 HTML 轉為純文字（連續空白合併為一個）"""
+    if not markup:
+        return ''
+    parser = _TextExtractor()
+    parser.feed(markup)
+    parser.close()
+    return ' '.join(''.join(parser.parts).split())
+
+
+def _flatten(template):
+    """將多行 HTML 樣板壓扁成一行（只在載入模組時執行一次）"""
+    return "".join(line.strip() for line in template.split('\n'))
+
+
+# 每一條新聞的 HTML (details 標籤)
+# 修正：font-weight: 600 -> normal (去粗體)
+_ITEM_TEMPLATE = _flatten("""
+    <details style="border-bottom: 1px solid #f0f0f0; margin: 0; padding: 4px 0; background-color: white;">
+        <summary style="font-family: 'Calibri', sans-serif; font-size: 10pt; font-weight: normal; cursor: pointer; outline: none; color: #333; list-style: none;">
+            <span style="margin-right: 5px;">➤</span> {title}
+        </summary>
+        <div style="font-family: 'Calibri', sans-serif; font-size: 10px; color: #666; padding: 4px 0 4px 18px; line-height: 1.4;">
+            <a href="{link}" target="_blank" style="color: #1f77b4; text-decoration: none; font-weight: bold;">🔗 閱讀全文</a><br>
+            {summary}
+        </div>
+    </details>
+""")
+# 包裹在外層 div
+_BLOCK_TEMPLATE = '<div style="border-top: 1px solid #f0f0f0;">{items}</div>'
+
+
+def _safe_link(link):
+    """只允許 http/https 連結，避免 javascript: 等注入"""
+    link = (link or '').strip()
+    return link if link.lower().startswith(('http://', 'https://')) else '#'
+
+
+def render_article_html(title, link, summary):
+    """產生單則新聞的 HTML；title/summary 為純文字，輸出前一律 escape"""
+    if summary:
+        summary = summary[:SUMMARY_LENGTH] + "..." if len(summary) > SUMMARY_LENGTH else summary
+    else:
+        summary = "點擊閱讀更多..."
+    return _ITEM_TEMPLATE.format(
+        title=html.escape(title),
+        link=html.escape(_safe_link(link)),
+        summary=html.escape(summary)
+    )
+
+
+def render_feed_block(articles):
+    """將 [(title, link, summary), ...] 組成一個來源的完整 HTML 區塊"""
+    return _BLOCK_TEMPLATE.format(items="".join(render_article_html(*article) for article in articles))
+
+
+# ==================== 文章儲存（articles / feed_blocks 資料表） ====================
+
+def feed_content_hash(entries, max_entries=MAX_ENTRIES):
+    """feed 內容（與顯示則數）的雜湊；沒變時跳過清理、渲染與寫入"""
+    payload = json.dumps(
+        [max_entries, [[e.get('id'), e.get('title'), e.get('link'), e.get('summary')] for e in entries]],
+        ensure_ascii=False
+    )
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _article_row(source_url, entry, index, now):
+    """將 feedparser entry 轉為 articles 資料表的一列（title/summary 存純文字）"""
+    link = entry.get('link', '')
+    guid = entry.get('id') or link or entry.get('title', '')
+    title = html_to_text(entry.get('title', ''))
+    summary = html_to_text(entry.get('summary', ''))
+
+    # 有發布時間就依發布時間排序；沒有則沿用 feed 內的順序
+    published = entry.get('published_parsed') or entry.get('updated_parsed')
+    sort_ts = calendar.timegm(published) if published else now - index * 0.001
+
+    return (source_url, guid, title, link, summary, sort_ts, now)
+
+
+def _select_articles(c, source_url, guids):
+    """{guid: (id, title, summary, link)}"""
+    rows = select_in(c, 'SELECT guid, id, title, summary, link FROM articles WHERE source_url = ? AND guid IN ({marks})', guids, (source_url,))
+    return {guid: tuple(rest) for guid, *rest in rows}
+
+
+def _index_bigrams(c, rows):
+    """將新增或內容有變的文章 [(id, title, summary, link), ...] 寫入 2 字詞索引（刪除由 trigger 處理）"""
+    c.executemany('DELETE FROM articles_bigram WHERE rowid = ?', [(row[0],) for row in rows])
+    c.executemany(
+        'INSERT INTO articles_bigram (rowid, title, summary, link) VALUES (?, ?, ?, ?)',
+        [(article_id, bigram_text(title), bigram_text(summary), bigram_text(link)) for article_id, title, summary, link in rows]
+    )
+
+
+def store_articles(source_url, entries, max_entries=MAX_ENTRIES, db_file=DB_FILE):
+    """寫入一個來源的文章並重建該來源的 HTML 區塊
+
+    同一 GUID（或連結）只保留一列；feed 內容雜湊與上次相同時不做任何事。
+    新增或標題/摘要/連結有變的文章同時寫入 articles_bigram（見 db.py migration 11）。
+    """
+    if not entries:
+        return
+    content_hash = feed_content_hash(entries, max_entries)
+    with transaction(db_file) as c:
+        c.execute('SELECT content_hash FROM feed_blocks WHERE source_url = ?', (source_url,))
+        row = c.fetchone()
+        if row and row[0] == content_hash:
+            return
+
+        now = time.time()
+        rows = [_article_row(source_url, entry, i, now) for i, entry in enumerate(entries)]
+        guids = list({row[1] for row in rows})
+        before = _select_articles(c, source_url, guids)
+        c.executemany('''
+            INSERT INTO articles (source_url, guid, title, link, summary, sort_ts, fetched_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(source_url, guid) DO UPDATE SET
+                title = excluded.title,
+                link = excluded.link,
+                summary = excluded.summary,
+                fetched_at = excluded.fetched_at
+        ''', rows)
+        after = _select_articles(c, source_url, guids)
+        _index_bigrams(c, [row for guid, row in after.items() if before.get(guid) != row])
+
+        c.execute(
+            'SELECT title, link, summary FROM articles WHERE source_url = ? ORDER BY sort_ts DESC, id LIMIT ?',
+            (source_url, max_entries)
+        )
+        block = render_feed_block(c.fetchall())
+        c.execute('''
+            INSERT INTO feed_blocks (source_url, content_hash, html, updated_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT(source_url) DO UPDATE SET
+                content_hash = excluded.content_hash,
+                html = excluded.html,
+                updated_at = excluded.updated_at
+        ''', (source_url, content_hash, block, now))
+
+
+def load_feed_blocks(source_urls, db_file=DB_FILE):
+    """一次查詢取出多個來源預先產生的 HTML 區塊 {url: html}，不觸及網路"""
+    with transaction(db_file) as c:
+        return dict(select_in(c, 'SELECT source_url, html FROM feed_blocks WHERE source_url IN ({marks})', source_urls))
+
+
+# ==================== 新聞來源設定（feeds 資料表） ====================
+
+# 可在設定畫面編輯的欄位
+FEED_FIELDS = ('name', 'url', 'refresh_interval', 'max_entries', 'enabled', 'slot')
+
+
+def load_feeds(enabled_only=False, db_file=DB_FILE):
+    """讀取新聞來源設定，依版面位置 (slot) 排序"""
+    where = 'WHERE enabled' if enabled_only else ''
+    with transaction(db_file) as c:
+        c.execute(f'''
+            SELECT id, name, url, refresh_interval, max_entries, enabled, slot, last_fetched
+            FROM feeds {where} ORDER BY slot, id
+        ''')
+        columns = [d[0] for d in c.description]
+        return [dict(zip(columns, row)) for row in c.fetchall()]
+
+
+def save_feeds(feeds, db_file=DB_FILE):
+    """以設定畫面的內容取代來源清單
+
+    同一網址保留原本的 last_fetched；顯示則數 (max_entries) 改變時清除，讓背景 thread 立即重新抓取並重建區塊。
+    """
+    rows = []
+    for feed in feeds:
+        name = str(feed.get('name') or '').strip()
+        url = str(feed.get('url') or '').strip()
+        if not name or not url:
+            continue
+        rows.append((
+            name,
+            url,
+            max(60, int(feed.get('refresh_interval') or REFRESH_INTERVAL)),
+            max(1, int(feed.get('max_entries') or MAX_ENTRIES)),
+            1 if feed.get('enabled', True) else 0,
+            int(feed.get('slot') or 0)
+        ))
+    with transaction(db_file) as c:
+        c.execute(f'DELETE FROM feeds WHERE url NOT IN ({",".join("?" * len(rows))})', [row[1] for row in rows])
+        c.executemany('''
+            INSERT INTO feeds (name, url, refresh_interval, max_entries, enabled, slot)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                name = excluded.name,
+                refresh_interval = excluded.refresh_interval,
+                max_entries = excluded.max_entries,
+                enabled = excluded.enabled,
+                slot = excluded.slot,
+                last_fetched = CASE WHEN feeds.max_entries = excluded.max_entries THEN feeds.last_fetched END
+        ''', rows)
+
+
+def _mark_fetched(feed_ids, now, db_file=DB_FILE):
+    with transaction(db_file) as c:
+        c.executemany('UPDATE feeds SET last_fetched = ? WHERE id = ?', [(now, feed_id) for feed_id in feed_ids])
+
+
+# ==================== 背景更新 ====================
+
+class FeedRefresher(threading.Thread):
+    """依 feeds 資料表中各來源的更新間隔抓取新聞，寫入 articles 資料表的背景 thread"""
+
+    def __init__(self, db_file=DB_FILE, poll_interval=POLL_INTERVAL):
+        super().__init__(name="feed-refresher", daemon=True)
+        self.db_file = db_file
+        self.poll_interval = poll_interval
+        self.state = {}
+        # 抓取失敗的來源 {url: 可重試的時間}；last_fetched 只記錄成功（含 304）的抓取
+        self._retry_at = {}
+        self._wake_event = threading.Event()
+        self._stopped = False
+
+    def refresh_once(self, now=None):
+        """只抓取已到期的來源；回傳距離下一個來源到期的秒數
+
+        304 或失敗的來源沿用舊資料，不會清空資料表；失敗的來源在 RETRY_INTERVAL 後重試。
+        """
+        now = time.time() if now is None else now
+        feeds = load_feeds(enabled_only=True, db_file=self.db_file)
+
+        def next_fetch(feed):
+            return max((feed['last_fetched'] or 0) + feed['refresh_interval'], self._retry_at.get(feed['url'], 0))
+
+        due = [feed for feed in feeds if next_fetch(feed) <= now]
+        if due:
+            previous = {url: cached['entries'] for url, cached in self.state.items()}
+            results = fetch_feeds(due, self.state)
+            fetched = []
+            for feed in due:
+                ok = FETCH_STATS.get(feed['url'], {}).get('status') != 'error'
+                entries = results[feed['url']]
+                # 304 或失敗時拿回的是同一份快取，不需重寫
+                if ok and entries is not previous.get(feed['url']):
+                    try:
+                        store_articles(feed['url'], entries, feed['max_entries'], db_file=self.db_file)
+                    except Exception:
+                        ok = False
+                if ok:
+                    self._retry_at.pop(feed['url'], None)
+                    fetched.append(feed['id'])
+                    feed['last_fetched'] = now
+                else:
+                    self._retry_at[feed['url']] = now + min(RETRY_INTERVAL, feed['refresh_interval'])
+            _mark_fetched(fetched, now, db_file=self.db_file)
+
+        return max(0, min((next_fetch(feed) - now for feed in feeds), default=self.poll_interval))
+
+    def run(self):
+        while not self._stopped:
+            try:
+                wait = self.refresh_once()
+            except Exception:
+                wait = self.poll_interval
+            # 設定變更時 wake() 會提早喚醒
+            self._wake_event.wait(min(wait, self.poll_interval))
+            self._wake_event.clear()
+
+    def wake(self):
+        """立即重新讀取來源設定並抓取到期的來源"""
+        self._wake_event.set()
+
+    def stop(self):
+        self._stopped = True
+        self._wake_event.set()
@@ -0,0 +1,115 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# ==================== 效能分析模式 ====================
+# 以 ?profile=1 或環境變數 MORNING_PROFILE=1 開啟；關閉時所有呼叫都是 no-op
+
+PROFILE_ENV = "MORNING_PROFILE"
+# 每次 rerun 的數據附加到這個 JSONL 檔，方便追蹤效能退化
+PROFILE_LOG = os.environ.get("MORNING_PROFILE_LOG", "profile_log.jsonl")
+
+# 目前 script thread 正在記錄的 Profiler（Streamlit 每個 session 的 rerun 在各自的 thread 執行）
+_local = threading.local()
+
+
+def profiling_enabled(query_params):
+    """依網址參數或環境變數判斷是否開啟分析模式"""
+    return query_params.get('profile') == '1' or os.environ.get(PROFILE_ENV) == '1'
+
+
+def current_profiler():
+    """目前 thread 上啟用中的 Profiler，沒有則為 None"""
+    return getattr(_local, 'profiler', None)
+
+
+class _ProfiledCursor(sqlite3.Cursor):
+    """記錄查詢數與讀出列數的 cursor（只在分析模式下使用，建立後需設定 profiler）"""
+
+    profiler = None
+
+    def execute(self, *args):
+        self.profiler.queries += 1
+        return super().execute(*args)
+
+    def executemany(self, *args):
+        self.profiler.queries += 1
+        return super().executemany(*args)
+
+    def fetchone(self):
+        row = super().fetchone()
+        self.profiler.rows += row is not None
+        return row
+
+    def fetchmany(self, *args):
+        rows = super().fetchmany(*args)
+        self.profiler.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        self.profiler.rows += len(rows)
+        return rows
+
+
+class Profiler:
+    """一次 rerun 的各區段耗時、SQLite 查詢數/列數與新聞區塊快取命中"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.sections = {}
+        self.queries = 0
+        self.rows = 0
+        self.feeds = {}
+        _local.profiler = self
+
+    def cursor(self, conn):
+        """在 conn 上建立會計數的 cursor"""
+        cursor = conn.cursor(_ProfiledCursor)
+        cursor.profiler = self
+        return cursor
+
+    def lap(self, name):
+        """記錄從上一個 lap（或開始）到現在的耗時，歸在 name 區段"""
+        now = time.perf_counter()
+        self.sections[name] = self.sections.get(name, 0) + (now - self._last) * 1000
+        self._last = now
+
+    def record_feed(self, name, url, hit, fetch_stats=None):
+        """記錄一個新聞來源：渲染時是否命中預先產生的區塊，以及背景抓取的延遲/狀態"""
+        self.feeds[name] = {'url': url, 'hit': hit, **(fetch_stats or {})}
+
+    def finish(self):
+        """結束記錄並回傳這次 rerun 的摘要"""
+        _local.profiler = None
+        return {
+            'ts': time.time(),
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 2),
+            'sections_ms': {name: round(ms, 2) for name, ms in self.sections.items()},
+            'sqlite_queries': self.queries,
+            'sqlite_rows': self.rows,
+            'feeds': self.feeds,
+        }
+
+    @staticmethod
+    def append_log(report, path=PROFILE_LOG):
+        """將摘要附加到 JSONL 紀錄檔"""
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(report, ensure_ascii=False) + '\n')
+
+
+class NullProfiler:
+    """分析模式關閉時使用，所有方法都不做事"""
+
+    def __init__(self):
+        # 同一個 script thread 上一次 rerun 若中途結束，不讓它的 Profiler 繼續計數
+        _local.profiler = None
+
+    def lap(self, name):
+        pass
+
+    def record_feed(self, name, url, hit, fetch_stats=None):
+        pass
@@ -0,0 +1,18 @@
+import html
+
+# ==================== 共用的頁面 HTML 片段 ====================
+# 儀表板（app.py）與靜態快照（snapshot.py）都從這裡取得，兩邊的輸出保持一致
+
+# 新聞來源標題與尚無文章時的占位內容
+_SOURCE_TITLE_TEMPLATE = '<div style="font-family:Calibri; font-size:14px; font-weight:bold; margin-bottom:5px; padding-top:10px;">{name}</div>'
+EMPTY_BLOCK_HTML = '<div class="calibri-text" style="color: #999;">暫無資料</div>'
+
+
+def render_page_title(now):
+    """頁面大標題；now 為 date 或 datetime"""
+    return f'<div class="centered-title"><h1>🌅 Morning! It\'s {now.strftime("%Y-%m-%d")} {now.strftime("%a")}.</h1></div>'
+
+
+def render_source_title(name):
+    """新聞來源標題的 HTML（名稱會 escape）"""
+    return _SOURCE_TITLE_TEMPLATE.format(name=html.escape(name))
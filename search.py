@@ -0,0 +1,133 @@
+from db import DB_FILE, END_SORT, bigram_text, transaction
+
+# ==================== 全文檢索（SQLite FTS5） ====================
+
+# 每類結果最多回傳的筆數
+SEARCH_LIMIT = 20
+# trigram 斷詞只能比對 3 個字元以上的詞
+MIN_MATCH_LENGTH = 3
+
+
+def _terms(query):
+    return [term for term in query.split() if term]
+
+
+def _split_terms(terms):
+    """分成 (trigram 可比對的詞, 2 字詞索引可比對的詞, 只能用 LIKE 的詞)
+
+    2 字詞（如「台灣」）由 articles_bigram 比對；1 個字元或含標點的短詞只能用 LIKE，
+    有其他可用索引的詞時 LIKE 只套用在索引找出的候選列上。
+    """
+    long_terms, bigram_terms, like_terms = [], [], []
+    for term in terms:
+        if len(term) >= MIN_MATCH_LENGTH:
+            long_terms.append(term)
+        elif bigram_text(term) == term:
+            bigram_terms.append(term)
+        else:
+            like_terms.append(term)
+    return long_terms, bigram_terms, like_terms
+
+
+def _match_expression(terms):
+    """將使用者輸入轉為 FTS5 查詢：每個詞加上雙引號視為字串，詞與詞之間為 AND"""
+    return ' '.join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def _like_clause(columns, terms):
+    """所有詞都必須出現在任一欄位中的 LIKE 條件"""
+    clauses, params = [], []
+    for term in terms:
+        pattern = '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        clauses.append('(' + ' OR '.join(f"{column} LIKE ? ESCAPE '\\'" for column in columns) + ')')
+        params.extend([pattern] * len(columns))
+    return ' AND '.join(clauses), params
+
+
+def search_articles(query, limit=SEARCH_LIMIT, db_file=DB_FILE):
+    """搜尋新聞標題/摘要/連結，依相關度 (bm25) 排序
+
+    有 3 字以上的詞時以 trigram 索引排序，只有 2 字詞時以 2 字詞索引排序；
+    都沒有（只有 1 個字元的詞）才退回 LIKE 掃描，依時間由新到舊。
+    """
+    terms = _terms(query)
+    if not terms:
+        return []
+    long_terms, bigram_terms, like_terms = _split_terms(terms)
+    where, params = [], []
+    if long_terms:
+        source = 'articles_fts JOIN articles a ON a.id = articles_fts.rowid'
+        snippet = "snippet(articles_fts, 1, '[', ']', '…', 12)"
+        where.append('articles_fts MATCH ?')
+        params.append(_match_expression(long_terms))
+        order = 'bm25(articles_fts, 10.0, 1.0, 0.5)'
+        if bigram_terms:
+            where.append('a.id IN (SELECT rowid FROM articles_bigram WHERE articles_bigram MATCH ?)')
+            params.append(_match_expression(bigram_terms))
+    elif bigram_terms:
+        # 2 字詞索引的內容是切開後的詞，摘要直接取原文開頭
+        source = 'articles_bigram JOIN articles a ON a.id = articles_bigram.rowid'
+        snippet = 'substr(a.summary, 1, 80)'
+        where.append('articles_bigram MATCH ?')
+        params.append(_match_expression(bigram_terms))
+        order = 'bm25(articles_bigram, 10.0, 1.0, 0.5)'
+    else:
+        source = 'articles a'
+        snippet = 'substr(a.summary, 1, 80)'
+        order = 'a.sort_ts DESC'
+    if like_terms:
+        clause, like_params = _like_clause(('a.title', 'a.summary', 'a.link'), like_terms)
+        where.append(clause)
+        params.extend(like_params)
+    with transaction(db_file) as c:
+        c.execute(f'''
+            SELECT a.title, a.link, {snippet}, a.sort_ts, f.name
+            FROM {source}
+            LEFT JOIN feeds f ON f.url = a.source_url
+            WHERE {' AND '.join(where)}
+            ORDER BY {order}
+            LIMIT ?
+        ''', (*params, limit))
+        rows = c.fetchall()
+    return [
+        {'title': title, 'link': link, 'snippet': snippet, 'sort_ts': sort_ts, 'source': source or ''}
+        for title, link, snippet, sort_ts, source in rows
+    ]
+
+
+def search_projects(query, limit=SEARCH_LIMIT, board_id=None, db_file=DB_FILE):
+    """搜尋專案名稱/連結，依相關度 (bm25) 排序；指定 board_id 時只搜尋該看板
+
+    有 3 字以上的詞時以 trigram 索引找出候選列，較短的詞再以 LIKE 篩選；
+    全部都是短詞時才掃描（專案數量遠少於新聞，且限定在單一看板）。
+    """
+    terms = _terms(query)
+    if not terms:
+        return []
+    long_terms = [term for term in terms if len(term) >= MIN_MATCH_LENGTH]
+    short_terms = [term for term in terms if len(term) < MIN_MATCH_LENGTH]
+    with transaction(db_file) as c:
+        if long_terms:
+            where, params = _like_clause(('p.name', 'p.url'), short_terms) if short_terms else ('1', [])
+            c.execute(f'''
+                SELECT p.key, p.name, p.url, p.end_date, p.progress
+                FROM projects_fts
+                JOIN projects p ON p.key = projects_fts.key
+                WHERE projects_fts MATCH ? AND {where} AND (? IS NULL OR p.board_id = ?)
+                ORDER BY bm25(projects_fts, 0.0, 10.0, 1.0)
+                LIMIT ?
+            ''', (_match_expression(long_terms), *params, board_id, board_id, limit))
+        else:
+            where, params = _like_clause(('p.name', 'p.url'), terms)
+            c.execute(f'''
+                SELECT p.key, p.name, p.url, p.end_date, p.progress
+                FROM projects p
+                WHERE {where} AND (? IS NULL OR p.board_id = ?)
+                ORDER BY {END_SORT}, p.key
+                LIMIT ?
+            ''', (*params, board_id, board_id, limit))
+        rows = c.fetchall()
+    return [
+        {'key': key, 'name': name, 'url': url or '', 'end_date': end_date or '', 'progress': progress or 0}
+        for key, name, url, end_date, progress in rows
+    ]
@@ -0,0 +1,175 @@
+import argparse
+import html
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from db import DB_FILE, DEFAULT_BOARD_ID, board_id_by_name, load_projects, query_projects
+from gantt import build_gantt_figure
+from news import FeedRefresher, load_feed_blocks, load_feeds
+from render import EMPTY_BLOCK_HTML, render_page_title, render_source_title
+
+# ==================== 靜態快照 ====================
+# 將晨間頁面（Gantt、Tracking、News Feed）輸出成單一 HTML 檔，交給任何靜態伺服器提供；
+# Streamlit 只留給需要編輯的時候使用。排程執行方式見 main()。
+
+DEFAULT_OUTPUT = "morning.html"
+# plotly.js 內嵌（檔案可離線開啟）或改由 CDN 載入（檔案小很多）
+PLOTLYJS_MODES = ('inline', 'cdn')
+
+_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="zh-Hant">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Morning Dashboard {date}</title>
+<style>
+    body {{ font-family: 'Calibri', sans-serif; margin: 1rem 2rem; color: #333; }}
+    .centered-title {{ text-align: center; font-family: 'Calibri', sans-serif; }}
+    .calibri-text {{ font-family: 'Calibri', sans-serif; font-size: 12px; }}
+    .header-18-bold {{ font-family: 'Calibri', sans-serif; font-size: 18px; font-weight: bold; margin: 1rem 0 0.5rem; }}
+    .caption {{ color: #999; font-size: 12px; text-align: center; }}
+    .layout {{ display: flex; gap: 2rem; }}
+    .left {{ flex: 0 0 40%; min-width: 0; }}
+    .right {{ flex: 1; min-width: 0; }}
+    .news-grid {{ display: grid; grid-template-columns: 1fr 1fr; gap: 0 1.5rem; }}
+    table.tracking {{ width: 100%; border-collapse: collapse; }}
+    table.tracking th, table.tracking td {{ text-align: left; padding: 2px 4px; border-bottom: 1px solid #f0f0f0; }}
+    hr {{ margin: 0.2rem 0; border: none; border-top: 1px solid #ddd; }}
+    @media (max-width: 900px) {{ .layout {{ flex-direction: column; }} .news-grid {{ grid-template-columns: 1fr; }} }}
+</style>
+</head>
+<body>
+{title}
+<div class="caption">{caption}</div>
+<hr>
+<div class="layout">
+<div class="left">
+{gantt}
+<div class="header-18-bold">Tracking</div>
+{tracking}
+</div>
+<div class="right">
+<div class="header-18-bold">News Feed</div>
+<div class="news-grid">{news}</div>
+</div>
+</div>
+</body>
+</html>
+"""
+
+
+def _render_gantt(projects, today, plotlyjs):
+    fig = build_gantt_figure(projects, today) if projects else None
+    if fig is None:
+        return f'<div class="calibri-text">{"沒有有效的專案日期資料" if projects else "目前沒有專案"}</div>'
+    return fig.to_html(
+        full_html=False,
+        include_plotlyjs=True if plotlyjs == 'inline' else 'cdn',
+        config={'displayModeBar': False, 'responsive': True}
+    )
+
+
+def _render_tracking(page_projects):
+    """與儀表板 Tracking 相同的欄位（依結束日期排序），以唯讀表格呈現"""
+    if not page_projects:
+        return '<div class="calibri-text">目前沒有專案</div>'
+    rows = []
+    for _, data in page_projects:
+        name = html.escape(data.get('name') or '未命名專案')
+        project_url = data.get('url', '').strip()
+        if project_url:
+            url = project_url if project_url.startswith(('http://', 'https://')) else 'https://' + project_url
+            name = f'<a href="{html.escape(url)}" target="_blank" style="text-decoration: none; color: #1f77b4;">{name}</a>'
+        rows.append(
+            f'<tr><td>{name}</td><td>{html.escape(data["start_date"])}</td>'
+            f'<td>{html.escape(data["end_date"])}</td><td>{int(data["progress"])}%</td></tr>'
+        )
+    return (
+        '<table class="tracking calibri-text"><tr><th>Project</th><th>Start Day</th><th>End Date</th><th>ACH%</th></tr>'
+        + "".join(rows) + '</table>'
+    )
+
+
+def _render_news(db_file):
+    """依版面位置輸出各來源：標題與預先渲染好的區塊（與儀表板相同的 HTML）"""
+    sources = load_feeds(enabled_only=True, db_file=db_file)
+    blocks = load_feed_blocks((source['url'] for source in sources), db_file=db_file)
+    return "".join(
+        f'<div>{render_source_title(source["name"])}{blocks.get(source["url"]) or EMPTY_BLOCK_HTML}</div>'
+        for source in sources
+    )
+
+
+def render_snapshot(board_id=DEFAULT_BOARD_ID, board_name=None, plotlyjs='inline', now=None, db_file=DB_FILE):
+    """產生整頁靜態 HTML（不需要 Streamlit session）；now 可為 date 或 datetime"""
+    now = now or datetime.now()
+    today = now.date() if isinstance(now, datetime) else now
+    projects = load_projects(board_id, db_file=db_file)
+    caption = f"快照產生於 {now.strftime('%Y-%m-%d %H:%M')}"
+    if board_name:
+        caption += f"・看板：{html.escape(board_name)}"
+    return _PAGE_TEMPLATE.format(
+        date=now.strftime('%Y-%m-%d'),
+        title=render_page_title(now),
+        caption=caption,
+        gantt=_render_gantt(projects, today, plotlyjs),
+        tracking=_render_tracking(query_projects('all', today, board_id=board_id, db_file=db_file)),
+        news=_render_news(db_file)
+    )
+
+
+def write_snapshot(path, page):
+    """先寫入同目錄的暫存檔再改名，靜態伺服器不會讀到寫到一半的檔案"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.snapshot-', suffix='.html')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(page)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+# ==================== CLI ====================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="輸出 Morning Dashboard 的靜態 HTML 快照")
+    parser.add_argument('output', nargs='?', default=DEFAULT_OUTPUT, help=f"輸出檔案（預設 {DEFAULT_OUTPUT}）")
+    parser.add_argument('--db', default=DB_FILE, help="資料庫檔案路徑")
+    parser.add_argument('--board', help="看板名稱（預設為預設看板）")
+    parser.add_argument('--refresh-feeds', action='store_true', help="輸出前先抓取已到期的新聞來源")
+    parser.add_argument('--plotlyjs', choices=PLOTLYJS_MODES, default='inline', help="plotly.js 內嵌或由 CDN 載入")
+    parser.add_argument('--every', type=int, metavar='SECONDS', help="每隔 SECONDS 秒重新輸出（不指定則只輸出一次，可交給 cron）")
+    args = parser.parse_args(argv)
+
+    board_id = DEFAULT_BOARD_ID
+    if args.board:
+        board_id = board_id_by_name(args.board, db_file=args.db)
+        if board_id is None:
+            parser.error(f"找不到看板：{args.board}")
+
+    refresher = FeedRefresher(db_file=args.db) if args.refresh_feeds else None
+    while True:
+        started = time.perf_counter()
+        try:
+            if refresher:
+                refresher.refresh_once()
+            write_snapshot(args.output, render_snapshot(board_id, args.board, args.plotlyjs, db_file=args.db))
+        except Exception as e:
+            # 常駐模式下單次失敗（資料庫被鎖住、磁碟寫入錯誤等）只記錄，下一輪再試；保留上一次輸出的檔案
+            print(f"輸出 {args.output} 失敗：{type(e).__name__}: {e}", file=sys.stderr)
+            if not args.every:
+                return 1
+        else:
+            print(f"已輸出 {args.output}（{(time.perf_counter() - started) * 1000:.0f} ms）", file=sys.stderr)
+            if not args.every:
+                return 0
+        time.sleep(args.every)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
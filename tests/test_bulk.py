@@ -0,0 +1,90 @@
+import io
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bulk  # noqa: E402
+from db import load_projects  # noqa: E402
+
+
+def records(text, chunk_size=None, monkeypatch=None):
+    if chunk_size:
+        monkeypatch.setattr(bulk, 'CHUNK_SIZE', chunk_size)
+    return list(bulk._iter_json(io.StringIO(text)))
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 64 * 1024])
+def test_iter_json_array_across_chunks(monkeypatch, chunk_size):
+    items = [{'name': f'專案 {i}', 'progress': 12345 + i, 'url': 'https://example.com/' + 'x' * i} for i in range(20)]
+    text = ' \n' + json.dumps(items, ensure_ascii=False, indent=2) + '\n'
+    assert records(text, chunk_size, monkeypatch) == list(enumerate(items, start=1))
+
+
+@pytest.mark.parametrize('chunk_size', [1, 5, 64 * 1024])
+def test_iter_json_object_layout(monkeypatch, chunk_size):
+    text = '{"a": {"name": "A", "progress": 10}, "b" : {"name": "B"}}'
+    assert records(text, chunk_size, monkeypatch) == [
+        (1, {'key': 'a', 'name': 'A', 'progress': 10}),
+        (2, {'key': 'b', 'name': 'B'}),
+    ]
+
+
+def test_iter_json_number_at_chunk_boundary(monkeypatch):
+    # 數字停在緩衝區結尾時不能被當成較短的數字
+    assert records('[123456, 7]', 4, monkeypatch) == [(1, 123456), (2, 7)]
+
+
+@pytest.mark.parametrize('text', ['[]', '  {}  '])
+def test_iter_json_empty(text):
+    assert records(text) == []
+
+
+@pytest.mark.parametrize('text', ['[{"name": "a"},]', '[{"name": "a"},,{"name": "b"}]', '[,{"name": "a"}]', '[{"name": "a"} {"name": "b"}]'])
+def test_iter_json_rejects_stray_commas(text):
+    with pytest.raises(ValueError):
+        records(text)
+
+
+def test_iter_json_rejects_non_container():
+    with pytest.raises(ValueError):
+        records('"text"')
+
+
+def test_import_skips_bad_jsonl_lines_and_types(tmp_path):
+    db_file = str(tmp_path / 'test.db')
+    text = '\n'.join([
+        '{"key": "a", "name": "a"}',
+        'not json',
+        '{"key": "b", "name": "b", "start_date": 20260101}',
+        '{"key": "c", "name": "c", "progress": [1]}',
+        '{"key": "d", "name": "d", "start_date": "2026-01-01", "end_date": "2026-02-01"}',
+    ]) + '\n'
+    imported, errors = bulk.import_projects(io.StringIO(text), 'jsonl', db_file=db_file)
+    assert imported == 2
+    assert [position for position, _ in errors] == [2, 3, 4]
+    assert set(load_projects(db_file=db_file)) == {'a', 'd'}
+
+
+def test_import_keeps_records_before_broken_json(tmp_path):
+    db_file = str(tmp_path / 'test.db')
+    imported, errors = bulk.import_projects(io.StringIO('[{"name": "a"}, {"name": "b"} oops'), 'json', db_file=db_file)
+    assert imported == 2
+    assert [position for position, _ in errors] == [3]
+
+
+def test_import_reports_keys_owned_by_other_board(tmp_path):
+    from db import DEFAULT_BOARD_ID, create_board
+
+    db_file = str(tmp_path / 'test.db')
+    bulk.import_projects(io.StringIO('{"key": "shared", "name": "a"}\n'), 'jsonl', db_file=db_file)
+    other = create_board('Other', db_file=db_file)
+    text = '{"key": "shared", "name": "b"}\n{"key": "own", "name": "c"}\n'
+    imported, errors = bulk.import_projects(io.StringIO(text), 'jsonl', board_id=other, db_file=db_file)
+    assert imported == 1
+    assert [position for position, _ in errors] == [1]
+    assert set(load_projects(other, db_file=db_file)) == {'own'}
+    assert load_projects(DEFAULT_BOARD_ID, db_file=db_file)['shared']['name'] == 'a'
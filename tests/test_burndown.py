@@ -0,0 +1,118 @@
+import os
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from burndown import velocity_summary  # noqa: E402
+from db import (  # noqa: E402
+    DEFAULT_BOARD_ID, PROGRESS_ONLY, create_board, delete_projects, load_projects, progress_burndown, project_history,
+    save_projects, transaction
+)
+
+TODAY = date.today()
+
+
+def project(progress, version=0):
+    return {'name': 'p', 'start_date': '2026-01-01', 'end_date': '2026-02-01', 'progress': progress, 'url': '', 'version': version}
+
+
+def set_progress(key, progress, db_file, board_id=DEFAULT_BOARD_ID):
+    projects = load_projects(board_id, db_file=db_file)
+    projects[key]['progress'] = progress
+    save_projects(projects, dirty={key: PROGRESS_ONLY}, board_id=board_id, db_file=db_file)
+
+
+def today_row(db_file, board_id=DEFAULT_BOARD_ID):
+    rows = progress_burndown(TODAY, TODAY, board_id=board_id, db_file=db_file)
+    assert [row['date'] for row in rows] == [TODAY]
+    return {k: rows[0][k] for k in ('projects', 'completed', 'remaining', 'gained')}
+
+
+def assert_rollup_matches_projects(db_file):
+    """每個看板的累計彙總必須等於直接從 projects 算出的結果"""
+    with transaction(db_file) as c:
+        c.execute('''
+            SELECT board_id, count(*), sum(progress >= 100), 100 * count(*) - sum(progress) FROM projects GROUP BY board_id
+        ''')
+        expected = {board_id: (n, completed, remaining) for board_id, n, completed, remaining in c.fetchall()}
+        c.execute('SELECT board_id, sum(projects), sum(completed), 100 * sum(projects) - sum(progress) FROM progress_daily GROUP BY board_id')
+        actual = {board_id: (n, completed, remaining) for board_id, n, completed, remaining in c.fetchall() if n}
+    assert actual == expected
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    return str(tmp_path / 'test.db')
+
+
+def test_insert_counts_project_but_not_velocity(db_file):
+    save_projects({'a': project(30), 'b': project(100)}, dirty={'a': None, 'b': None}, db_file=db_file)
+    assert today_row(db_file) == {'projects': 2, 'completed': 1, 'remaining': 70, 'gained': 0}
+    assert_rollup_matches_projects(db_file)
+
+
+def test_progress_update_counts_velocity(db_file):
+    save_projects({'a': project(30)}, dirty={'a': None}, db_file=db_file)
+    set_progress('a', 50, db_file)
+    set_progress('a', 100, db_file)
+    assert today_row(db_file) == {'projects': 1, 'completed': 1, 'remaining': 0, 'gained': 70}
+    # 同一天多次修改只保留最後的進度
+    assert project_history('a', db_file=db_file) == [(TODAY, 100)]
+    set_progress('a', 80, db_file)
+    assert today_row(db_file) == {'projects': 1, 'completed': 0, 'remaining': 20, 'gained': 50}
+    assert_rollup_matches_projects(db_file)
+
+
+def test_unchanged_progress_is_not_recorded(db_file):
+    save_projects({'a': project(30)}, dirty={'a': None}, db_file=db_file)
+    projects = load_projects(db_file=db_file)
+    projects['a']['name'] = 'renamed'
+    save_projects(projects, dirty={'a': None}, db_file=db_file)
+    assert today_row(db_file)['gained'] == 0
+
+
+def test_delete_removes_project_without_velocity(db_file):
+    save_projects({'a': project(30), 'b': project(100)}, dirty={'a': None, 'b': None}, db_file=db_file)
+    delete_projects(['b'], db_file=db_file)
+    assert today_row(db_file) == {'projects': 1, 'completed': 0, 'remaining': 70, 'gained': 0}
+    assert project_history('b', db_file=db_file) == [(TODAY, None)]
+    assert_rollup_matches_projects(db_file)
+
+
+def test_board_move_shifts_rollup_between_boards(db_file):
+    other = create_board('Other', db_file=db_file)
+    save_projects({'a': project(40), 'b': project(100)}, dirty={'a': None, 'b': None}, db_file=db_file)
+    with transaction(db_file) as c:
+        c.execute('UPDATE projects SET board_id = ? WHERE key = ?', (other, 'b'))
+        # 同時改變看板與進度：進度差額不算入任一看板的速度
+        c.execute('UPDATE projects SET board_id = ?, progress = 60 WHERE key = ?', (other, 'a'))
+
+    assert today_row(db_file, DEFAULT_BOARD_ID) == {'projects': 0, 'completed': 0, 'remaining': 0, 'gained': 0}
+    assert today_row(db_file, other) == {'projects': 2, 'completed': 1, 'remaining': 40, 'gained': 0}
+    assert today_row(db_file, None) == {'projects': 2, 'completed': 1, 'remaining': 40, 'gained': 0}
+    assert project_history('a', db_file=db_file) == [(TODAY, 60)]
+    assert_rollup_matches_projects(db_file)
+
+
+def test_burndown_carries_state_into_range(db_file):
+    save_projects({'a': project(20)}, dirty={'a': None}, db_file=db_file)
+    # 把今天的彙總移到 10 天前，模擬過去的紀錄
+    with transaction(db_file) as c:
+        c.execute('UPDATE progress_daily SET day = day - 10')
+    rows = progress_burndown(TODAY - timedelta(days=3), TODAY, db_file=db_file)
+    assert rows == [{'date': TODAY - timedelta(days=3), 'projects': 1, 'completed': 0, 'remaining': 80, 'gained': 0}]
+
+
+def test_velocity_summary_projects_finish():
+    rows = [
+        {'date': TODAY - timedelta(days=1), 'remaining': 100, 'gained': 10},
+        {'date': TODAY, 'remaining': 90, 'gained': 10},
+    ]
+    velocity, finish = velocity_summary(rows, 2)
+    assert velocity == 10
+    assert finish == TODAY + timedelta(days=9)
+    assert velocity_summary([], 30) == (0.0, None)
+    assert velocity_summary([{**rows[-1], 'gained': 0}], 30)[1] is None
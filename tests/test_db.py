@@ -0,0 +1,126 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import (  # noqa: E402
+    PROGRESS_ONLY, ConflictError, bulk_upsert, create_board, delete_projects, load_changed_projects, load_projects, save_projects, upsert_projects
+)
+
+
+def project(name, progress=0, version=0):
+    return {'name': name, 'start_date': '2026-01-01', 'end_date': '2026-02-01', 'progress': progress, 'url': '', 'version': version}
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    db_file = str(tmp_path / 'test.db')
+    save_projects({'a': project('a'), 'b': project('b')}, dirty={'a': None, 'b': None}, db_file=db_file)
+    return db_file
+
+
+def test_insert_and_update_bump_version(db_file):
+    projects = load_projects(db_file=db_file)
+    assert projects['a']['version'] == 1
+    projects['a']['name'] = 'renamed'
+    save_projects(projects, dirty={'a': None}, db_file=db_file)
+    assert projects['a']['version'] == 2
+    assert load_projects(db_file=db_file)['a'] == {**projects['a']}
+
+
+def test_stale_update_raises_conflict(db_file):
+    mine = load_projects(db_file=db_file)
+    theirs = load_projects(db_file=db_file)
+    theirs['a']['name'] = 'theirs'
+    save_projects(theirs, dirty={'a': None}, db_file=db_file)
+
+    mine['a']['name'] = 'mine'
+    with pytest.raises(ConflictError) as e:
+        save_projects(mine, dirty={'a': None}, db_file=db_file)
+    assert e.value.keys == ['a']
+    assert load_projects(db_file=db_file)['a']['name'] == 'theirs'
+
+
+def test_stale_progress_update_raises_conflict(db_file):
+    mine = load_projects(db_file=db_file)
+    theirs = load_projects(db_file=db_file)
+    theirs['a']['progress'] = 50
+    save_projects(theirs, dirty={'a': PROGRESS_ONLY}, db_file=db_file)
+
+    mine['a']['progress'] = 20
+    with pytest.raises(ConflictError):
+        save_projects(mine, dirty={'a': PROGRESS_ONLY}, db_file=db_file)
+    assert load_projects(db_file=db_file)['a']['progress'] == 50
+
+
+def test_conflict_rolls_back_whole_batch(db_file):
+    mine = load_projects(db_file=db_file)
+    theirs = load_projects(db_file=db_file)
+    save_projects(theirs, dirty={'a': None}, db_file=db_file)
+
+    mine['a']['name'] = 'mine'
+    mine['b']['name'] = 'also mine'
+    with pytest.raises(ConflictError) as e:
+        save_projects(mine, dirty={'a': None, 'b': None}, db_file=db_file)
+    assert e.value.keys == ['a']
+    assert load_projects(db_file=db_file)['b']['name'] == 'b'
+    # 失敗時不更新呼叫端的版本
+    assert mine['b']['version'] == 1
+
+
+def test_insert_existing_key_raises_conflict(db_file):
+    with pytest.raises(ConflictError):
+        save_projects({'a': project('duplicate')}, dirty={'a': None}, db_file=db_file)
+
+
+def test_stale_delete_raises_conflict(db_file):
+    theirs = load_projects(db_file=db_file)
+    save_projects(theirs, dirty={'a': None}, db_file=db_file)
+
+    with pytest.raises(ConflictError):
+        save_projects({}, dirty={}, deleted={'a': 1}, db_file=db_file)
+    assert 'a' in load_projects(db_file=db_file)
+
+
+def test_delete_of_missing_row_is_not_a_conflict(db_file):
+    save_projects({}, dirty={}, deleted={'a': 1}, db_file=db_file)
+    save_projects({}, dirty={}, deleted={'a': 1}, db_file=db_file)
+    delete_projects(['b'], db_file=db_file)
+    assert load_projects(db_file=db_file) == {}
+
+
+def test_force_upsert_of_other_boards_key_raises_conflict(db_file):
+    other = create_board('Other', db_file=db_file)
+    with pytest.raises(ConflictError) as e:
+        upsert_projects({'a': {**project('taken'), 'version': None}, 'c': {**project('c'), 'version': None}}, board_id=other, db_file=db_file)
+    assert e.value.keys == ['a']
+    assert load_projects(other, db_file=db_file) == {}
+    assert load_projects(db_file=db_file)['a']['name'] == 'a'
+
+    with pytest.raises(ConflictError):
+        save_projects({'a': {**project('taken'), 'version': None}}, board_id=other, db_file=db_file)
+
+
+def test_bulk_upsert_skips_other_boards_keys(db_file):
+    other = create_board('Other', db_file=db_file)
+    assert bulk_upsert({'c': project('c'), 'a': project('taken')}, board_id=other, db_file=db_file) == ['a']
+    assert list(load_projects(other, db_file=db_file)) == ['c']
+    assert load_projects(db_file=db_file)['a']['name'] == 'a'
+
+
+def test_delete_of_other_boards_key_is_not_a_conflict(db_file):
+    other = create_board('Other', db_file=db_file)
+    # 這個看板裡沒有 'a'：視為已刪除，不應因為其他看板有同名 key 而衝突
+    save_projects({}, dirty={}, deleted={'a': 1}, board_id=other, db_file=db_file)
+    assert 'a' in load_projects(db_file=db_file)
+
+
+def test_queries_span_multiple_in_chunks(db_file):
+    other = create_board('Other', db_file=db_file)
+    many = {f'k{i}': project(f'k{i}') for i in range(1200)}
+    assert bulk_upsert({**many, 'a': project('taken')}, board_id=other, db_file=db_file) == ['a']
+    changed, removed = load_changed_projects({'gone': 1}, board_id=other, db_file=db_file)
+    assert changed.keys() == many.keys()
+    assert removed == {'gone'}
@@ -0,0 +1,159 @@
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import feedparser
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import news  # noqa: E402
+
+RSS = b'''<?xml version="1.0" encoding="utf-8"?>
+<rss version="2.0"><channel><title>stub</title>
+<item><title>first</title><link>https://example.com/1</link><guid>1</guid></item>
+<item><title>second</title><link>https://example.com/2</link><guid>2</guid></item>
+<item><title>third</title><link>https://example.com/3</link><guid>3</guid></item>
+</channel></rss>'''
+ETAG = '"v1"'
+LAST_MODIFIED = 'Sat, 17 Oct 2026 00:00:00 GMT'
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """固定內容的 RSS；帶著相符的 ETag 或 Last-Modified 時回 304，並記下每次請求的 header"""
+
+    requests = []
+    fail = False
+
+    def do_GET(self):
+        type(self).requests.append(dict(self.headers))
+        if type(self).fail:
+            self.send_response(500)
+            self.end_headers()
+            return
+        if self.headers.get('If-None-Match') == ETAG or self.headers.get('If-Modified-Since') == LAST_MODIFIED:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml')
+        self.send_header('ETag', ETAG)
+        self.send_header('Last-Modified', LAST_MODIFIED)
+        self.send_header('Content-Length', str(len(RSS)))
+        self.end_headers()
+        self.wfile.write(RSS)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def stub_server():
+    _StubHandler.requests = []
+    _StubHandler.fail = False
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/feed.xml"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def parse_calls(monkeypatch):
+    calls = []
+    parse = feedparser.parse
+
+    def counting_parse(*args, **kwargs):
+        calls.append(args)
+        return parse(*args, **kwargs)
+
+    monkeypatch.setattr(feedparser, 'parse', counting_parse)
+    return calls
+
+
+def test_fetch_feed_sends_validators_and_reuses_entries_on_304(parse_calls):
+    with stub_server() as url:
+        state = {}
+        entries = news.fetch_feed(url, state, max_entries=2)
+        assert [entry.title for entry in entries] == ['first', 'second']
+        assert 'If-None-Match' not in _StubHandler.requests[0]
+
+        again = news.fetch_feed(url, state, max_entries=2)
+        assert _StubHandler.requests[1]['If-None-Match'] == ETAG
+        assert _StubHandler.requests[1]['If-Modified-Since'] == LAST_MODIFIED
+        assert again is entries
+        assert len(parse_calls) == 1
+        assert news.FETCH_STATS[url]['status'] == 304
+
+
+def test_fetch_feed_refetches_when_max_entries_changes(parse_calls):
+    with stub_server() as url:
+        state = {}
+        news.fetch_feed(url, state, max_entries=2)
+        entries = news.fetch_feed(url, state, max_entries=3)
+        # 則數改變時不帶 validator，重新下載並解析
+        assert 'If-None-Match' not in _StubHandler.requests[1]
+        assert len(entries) == 3
+        assert len(parse_calls) == 2
+
+
+def test_fetch_feed_keeps_previous_entries_on_error(parse_calls):
+    with stub_server() as url:
+        state = {}
+        entries = news.fetch_feed(url, state)
+        _StubHandler.fail = True
+        assert news.fetch_feed(url, state) is entries
+        assert news.FETCH_STATS[url]['status'] == 'error'
+        assert news.fetch_feed(url + '?other', {}) == []
+
+
+def test_refresh_once_retries_failed_feeds_after_backoff(tmp_path):
+    db_file = str(tmp_path / 'test.db')
+    with stub_server() as url:
+        news.save_feeds([{'name': 'stub', 'url': url, 'refresh_interval': 3600}], db_file=db_file)
+        refresher = news.FeedRefresher(db_file=db_file)
+        start = 1_000_000
+        _StubHandler.fail = True
+
+        # 失敗的來源不記錄 last_fetched，RETRY_INTERVAL 後再試
+        assert refresher.refresh_once(now=start) == news.RETRY_INTERVAL
+        assert news.load_feeds(db_file=db_file)[0]['last_fetched'] is None
+        refresher.refresh_once(now=start + news.RETRY_INTERVAL - 1)
+        assert len(_StubHandler.requests) == 1
+
+        _StubHandler.fail = False
+        retried = start + news.RETRY_INTERVAL
+        assert refresher.refresh_once(now=retried) == 3600
+        assert len(_StubHandler.requests) == 2
+        assert news.load_feeds(db_file=db_file)[0]['last_fetched'] == retried
+        assert url in news.load_feed_blocks([url], db_file=db_file)
+
+        # 304 也算成功
+        refresher.refresh_once(now=retried + 3600)
+        assert news.FETCH_STATS[url]['status'] == 304
+        assert news.load_feeds(db_file=db_file)[0]['last_fetched'] == retried + 3600
+
+
+def test_fetch_feeds_caps_worker_count(monkeypatch):
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def slow_fetch(url, state, timeout, max_entries):
+        with lock:
+            active.append(url)
+            peak.append(len(active))
+        threading.Event().wait(0.01)
+        with lock:
+            active.remove(url)
+        return []
+
+    monkeypatch.setattr(news, 'fetch_feed', slow_fetch)
+    results = news.fetch_feeds([{'url': str(i)} for i in range(news.MAX_WORKERS * 3)], {})
+    assert len(results) == news.MAX_WORKERS * 3
+    assert max(peak) <= news.MAX_WORKERS
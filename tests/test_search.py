@@ -0,0 +1,62 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import bigram_text  # noqa: E402
+from news import store_articles  # noqa: E402
+from search import search_articles  # noqa: E402
+
+ARTICLES = [
+    {'id': '1', 'title': '台灣選舉結果出爐', 'summary': '各黨得票率統計', 'link': 'https://example.com/a'},
+    {'id': '2', 'title': '美國總統大選', 'summary': '台灣關注選情', 'link': 'https://example.com/b'},
+    {'id': '3', 'title': 'AI 晶片出口', 'summary': '經濟部說明', 'link': 'https://example.com/c'},
+]
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    db_file = str(tmp_path / 'test.db')
+    store_articles('u', ARTICLES, db_file=db_file)
+    return db_file
+
+
+def titles(query, db_file):
+    return sorted(result['title'] for result in search_articles(query, db_file=db_file))
+
+
+def test_bigram_text():
+    assert bigram_text('台灣選舉') == '台灣 灣選 選舉'
+    assert bigram_text('AI, 晶片_x') == 'AI 晶片'
+    assert bigram_text(None) == ''
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('台灣', ['台灣選舉結果出爐', '美國總統大選']),
+    ('台灣 選舉', ['台灣選舉結果出爐']),
+    ('ai', ['AI 晶片出口']),
+    ('台灣選舉', ['台灣選舉結果出爐']),
+    ('選舉結果 台灣', ['台灣選舉結果出爐']),
+    ('經濟部 晶', ['AI 晶片出口']),
+    ('灣', ['台灣選舉結果出爐', '美國總統大選']),
+    ('選情', ['美國總統大選']),
+    ('台北', []),
+])
+def test_search_articles_matches_substrings(db_file, query, expected):
+    assert titles(query, db_file) == expected
+
+
+def test_bigram_index_follows_updates_and_deletes(db_file):
+    store_articles('u', [{**ARTICLES[0], 'title': '日本選舉', 'summary': ''}, *ARTICLES[1:]], db_file=db_file)
+    assert titles('日本', db_file) == ['日本選舉']
+    assert titles('台灣', db_file) == ['美國總統大選']
+
+    # 其他連線（sqlite3 CLI 等）也能刪除文章，索引由純 SQL trigger 同步
+    conn = sqlite3.connect(db_file)
+    with conn:
+        conn.execute("DELETE FROM articles WHERE guid = '2'")
+    conn.close()
+    assert titles('台灣', db_file) == []
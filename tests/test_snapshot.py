@@ -0,0 +1,46 @@
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import snapshot  # noqa: E402
+from db import save_projects  # noqa: E402
+
+
+def test_render_snapshot_uses_given_date(tmp_path):
+    db_file = str(tmp_path / 'test.db')
+    save_projects({'k': {'name': '<專案>', 'start_date': '2026-01-01', 'end_date': '2026-03-01', 'progress': 40, 'url': ''}}, db_file=db_file)
+    page = snapshot.render_snapshot(now=date(2026, 2, 1), plotlyjs='cdn', db_file=db_file)
+    assert "Morning! It's 2026-02-01 Sun." in page
+    assert '&lt;專案&gt;' in page and '<專案>' not in page
+    # Today 線畫在傳入的日期
+    assert '2026-02-01T00:00:00' in page
+
+
+def test_every_loop_survives_failed_iteration(tmp_path, monkeypatch, capsys):
+    db_file = str(tmp_path / 'test.db')
+    output = str(tmp_path / 'out.html')
+    calls = []
+
+    def flaky_render(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            raise OSError('database is locked')
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+        return '<html></html>'
+
+    monkeypatch.setattr(snapshot, 'render_snapshot', flaky_render)
+    monkeypatch.setattr(snapshot.time, 'sleep', lambda seconds: None)
+    try:
+        snapshot.main([output, '--db', db_file, '--every', '60'])
+    except KeyboardInterrupt:
+        pass
+    assert len(calls) == 3
+    assert open(output, encoding='utf-8').read() == '<html></html>'
+    assert 'database is locked' in capsys.readouterr().err
+
+
+def test_single_run_reports_failure(tmp_path):
+    assert snapshot.main([str(tmp_path / 'missing' / 'out.html'), '--db', str(tmp_path / 'test.db')]) == 1